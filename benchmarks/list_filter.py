@@ -0,0 +1,91 @@
+"""
+Compares ListFilterSet, which combines list values in one lookup, with the previous implementation, which OR-ed one
+filtered queryset per value. Measured are the size of the generated SQL, the time sqlite needs to plan the query and the
+Python time to build and compile the queryset. The previous implementation evaluated every intermediate queryset
+(`if not filtered_qs`), so its Python time includes one query per value.
+
+    PYTHONPATH=. python benchmarks/list_filter.py
+"""
+import time
+
+import django
+from django.conf import settings
+
+settings.configure(
+    INSTALLED_APPS=['django.contrib.auth', 'django.contrib.contenttypes'],
+    DATABASES={'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}},
+)
+django.setup()
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.http import QueryDict
+from django_filters import CharFilter, BooleanFilter
+
+from drf_tools.filters import ListFilterSet
+
+REPETITIONS = 20
+
+
+class UserFilterSet(ListFilterSet):
+    username = CharFilter(field_name='username')
+    email = CharFilter(field_name='email', lookup_expr='icontains')
+
+    class Meta:
+        model = User
+        fields = ['username', 'email']
+
+
+class OrQuerysetsUserFilterSet(UserFilterSet):
+    def filter_queryset(self, queryset):
+        for name, value in self.form.cleaned_data.items():
+            filter_ = self.filters[name]
+            value_list = self.data.getlist(name) if self.data else None
+            if value_list:
+                filtered_qs = None
+                for list_value in value_list:
+                    if isinstance(filter_, BooleanFilter):
+                        list_value = self._str_to_boolean(list_value)
+                    if not filtered_qs:
+                        filtered_qs = filter_.filter(queryset, list_value)
+                    else:
+                        filtered_qs |= filter_.filter(queryset, list_value)
+                queryset = filtered_qs
+        return queryset
+
+
+def measure(filterset_class, param, value_count):
+    data = QueryDict(mutable=True)
+    data.setlist(param, ['value{}'.format(i) for i in range(value_count)])
+
+    start = time.perf_counter()
+    for i in range(REPETITIONS):
+        sql, params = filterset_class(data, queryset=User.objects.all()).qs.query.sql_with_params()
+    python_time = (time.perf_counter() - start) / REPETITIONS
+
+    with connection.cursor() as cursor:
+        start = time.perf_counter()
+        for i in range(REPETITIONS):
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            cursor.fetchall()
+        planning_time = (time.perf_counter() - start) / REPETITIONS
+    return len(sql), python_time, planning_time
+
+
+if __name__ == '__main__':
+    call_command('migrate', verbosity=0)
+    User.objects.bulk_create(User(username='value{}'.format(i), email='value{}@example.com'.format(i))
+                             for i in range(1000))
+    print("{:<10} {:>6} {:<14} {:>10} {:>12} {:>12}".format("param", "values", "implementation", "sql chars",
+                                                           "python ms", "planning ms"))
+    for param in ('username', 'email'):
+        for value_count in (1, 10, 100, 1000):
+            for name, filterset_class in (("or-querysets", OrQuerysetsUserFilterSet), ("combined", UserFilterSet)):
+                try:
+                    sql_length, python_time, planning_time = measure(filterset_class, param, value_count)
+                except Exception as e:
+                    print("{:<10} {:>6} {:<14} failed: {}".format(param, value_count, name, e.__class__.__name__))
+                    continue
+                print("{:<10} {:>6} {:<14} {:>10} {:>12.2f} {:>12.2f}".format(
+                    param, value_count, name, sql_length, python_time * 1000, planning_time * 1000))
@@ -0,0 +1,88 @@
+"""
+Compares the parent link injection of nested create/update requests, which formats the parent url from the route of
+the resolver match, with the previous implementation, which split and re-joined the absolute request uri. Measured is
+the best time per call of several rounds for nested routes of one and two parent levels.
+
+    PYTHONPATH=. python benchmarks/parent_links.py
+"""
+import timeit
+
+import django
+from django.conf import settings
+
+settings.configure(
+    ROOT_URLCONF=__name__,
+    ALLOWED_HOSTS=['testserver'],
+    INSTALLED_APPS=['django.contrib.auth', 'django.contrib.contenttypes'],
+    DATABASES={'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}},
+)
+django.setup()
+
+from django.contrib.auth.models import Group, Permission, User
+from django.conf.urls import include, url
+from django.test import RequestFactory
+from django.urls import resolve
+from drf_nested_routing.views import NestedViewSetMixin
+from rest_framework.request import Request
+
+from drf_tools.routers import NestedRouterWithExtendedRootView
+from drf_tools.views import ModelViewSet, _get_parent_url
+
+REPETITIONS = 20000
+ROUNDS = 5
+
+
+class GroupViewSet(ModelViewSet):
+    queryset = Group.objects.all()
+
+
+class UserViewSet(NestedViewSetMixin, ModelViewSet):
+    queryset = User.objects.all()
+
+
+class PermissionViewSet(NestedViewSetMixin, ModelViewSet):
+    queryset = Permission.objects.all()
+
+
+router = NestedRouterWithExtendedRootView(list())
+user_route = router.register(r'groups', GroupViewSet).register(r'users', UserViewSet, ['groups'])
+user_route.register(r'permissions', PermissionViewSet, ['user__groups', 'user'])
+
+urlpatterns = [
+    url(r'^api/', include(router.urls)),
+]
+
+
+def get_parent_url_by_splitting(request, parentKey):
+    uriSplit = request.build_absolute_uri().split('/')
+    if request.method == 'PUT':
+        uriSplit = uriSplit[:-3]
+    else:
+        uriSplit = uriSplit[:-2]
+    return '/'.join(uriSplit) + '/'
+
+
+def create_request(method, path):
+    request = getattr(RequestFactory(), method)(path)
+    request.resolver_match = resolve(path)
+    return Request(request)
+
+
+def main():
+    cases = [
+        ('POST, 1 parent', create_request('post', '/api/groups/1/users/'), 'groups'),
+        ('PUT, 1 parent', create_request('put', '/api/groups/1/users/2/'), 'groups'),
+        ('POST, 2 parents', create_request('post', '/api/groups/1/users/2/permissions/'), 'user'),
+        ('PUT, 2 parents', create_request('put', '/api/groups/1/users/2/permissions/3/'), 'user'),
+    ]
+    print('{:<18}{:>14}{:>14}'.format('case', 'split [us]', 'route [us]'))
+    for name, request, parentKey in cases:
+        assert _get_parent_url(request, parentKey) == get_parent_url_by_splitting(request, parentKey)
+        split_time = min(timeit.repeat(lambda: get_parent_url_by_splitting(request, parentKey), number=REPETITIONS,
+                                       repeat=ROUNDS))
+        route_time = min(timeit.repeat(lambda: _get_parent_url(request, parentKey), number=REPETITIONS, repeat=ROUNDS))
+        print('{:<18}{:>14.2f}{:>14.2f}'.format(name, split_time / REPETITIONS * 1e6, route_time / REPETITIONS * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Compares the write-only XlsxSerializer.serialize with the previous implementation, which created a regular workbook and
+assigned every single cell.
+
+    PYTHONPATH=. python benchmarks/xlsx_export.py [rows] [columns]
+"""
+from datetime import datetime
+from decimal import Decimal
+from io import BytesIO
+import sys
+import time
+import tracemalloc
+
+import django
+from django.conf import settings
+
+settings.configure()
+django.setup()
+
+from openpyxl import Workbook
+
+from drf_tools.serializers import XlsxSerializer
+
+
+def serialize_with_cells(data):
+    workbook = Workbook()
+    sheet = workbook.active
+    for row_index, row in enumerate(data):
+        for column_index, value in enumerate(row):
+            if not isinstance(value, (int, float)):
+                value = str(value)
+            sheet.cell(column=column_index + 1, row=row_index + 1, value=value)
+    xlsx_file = BytesIO()
+    workbook.save(xlsx_file)
+    return xlsx_file.getvalue()
+
+
+def create_rows(row_count, column_count):
+    values = ("text", 42, 3.14, Decimal('2.50'), datetime(2020, 1, 1, 12, 30), True)
+    for row_index in range(row_count):
+        yield [values[column_index % len(values)] for column_index in range(column_count)]
+
+
+def measure(name, serialize, row_count, column_count):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = serialize(create_rows(row_count, column_count))
+    duration = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print("{:<12} {:>10.0f} rows/s {:>10.1f} MB peak {:>10} bytes".format(
+        name, row_count / duration, peak / 1024 / 1024, len(result)))
+
+
+if __name__ == '__main__':
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    columns = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    print("{} rows x {} columns".format(rows, columns))
+    measure("cells", serialize_with_cells, rows, columns)
+    measure("write-only", XlsxSerializer.serialize, rows, columns)
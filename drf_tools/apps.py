@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class DrfToolsConfig(AppConfig):
+    name = 'drf_tools'
+    verbose_name = 'DRF Tools'
+
+    def ready(self):
+        from drf_tools.validation.registry import validationRegistry
+        validationRegistry.connectCacheInvalidation()
@@ -3,3 +3,11 @@ from django.conf import settings
 USER_SETTINGS = getattr(settings, "DRF_TOOLS", {})
 
 PERMISSION_SERVICE = USER_SETTINGS.get("PERMISSION_SERVICE", None)
+
+# e.g. {'CACHE_ALIAS': 'default', 'TIMEOUT': 300, 'INVALIDATING_MODELS': ['app_label.ModelName']}, an empty dict
+# caches decisions only for the current request. Saving or deleting an instance of INVALIDATING_MODELS discards all
+# decisions, other changes of permissions have to send drf_tools.auth.permissioncache.permissions_changed.
+PERMISSION_CACHE = USER_SETTINGS.get("PERMISSION_CACHE", None)
+
+# e.g. {'CACHE_ALIAS': 'default', 'TIMEOUT': 60}, caches verified credentials of EmailAuthBackend
+AUTHENTICATION_CACHE = USER_SETTINGS.get("AUTHENTICATION_CACHE", None)
@@ -1,7 +1,15 @@
+import hashlib
+import hmac
+from threading import Lock
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models import Q
+from django.core.cache import caches
+from django.utils.crypto import salted_hmac
 from rest_framework.authentication import BasicAuthentication
 
+from drf_tools.auth import AUTHENTICATION_CACHE
+
 User = get_user_model()
 
 
@@ -19,22 +27,110 @@ class QuietBasicAuthentication(BasicAuthentication):
         return 'xBasic realm="%s"' % self.www_authenticate_realm
 
 
+class VerifiedCredentialCache(object):
+    """
+    Caches successful credential checks, so clients that send their credentials with every call don't cost a password
+    hash computation per request. The cache key is a keyed hash of username and password, the cached user is only
+    returned as long as the password of the user is unchanged.
+    """
+
+    def __init__(self, cache_alias='default', timeout=60, key_prefix='drf_tools.credentials'):
+        self.__cache_alias = cache_alias
+        self.__timeout = timeout
+        self.__key_prefix = key_prefix
+        self.__stats_lock = Lock()
+        self.__stats = dict(hits=0, misses=0, invalidations=0)
+
+    def get_user(self, username, password):
+        """Returns the user of verified credentials or None"""
+        cache_key = self.__get_cache_key(username, password)
+        entry = self.__get_cache().get(cache_key)
+        if entry is None:
+            self.__count('misses')
+            return None
+        user_id, password_digest = entry
+        user = User.objects.filter(pk=user_id).first()
+        if user is None or not hmac.compare_digest(self.__get_password_digest(user), password_digest):
+            # the password was changed or the user deleted since the credentials were verified
+            self.__get_cache().delete(cache_key)
+            self.__count('invalidations')
+            return None
+        self.__count('hits')
+        return user
+
+    def set(self, username, password, user):
+        self.__get_cache().set(self.__get_cache_key(username, password),
+                               (user.pk, self.__get_password_digest(user)), self.__timeout)
+
+    def get_stats(self):
+        with self.__stats_lock:
+            return dict(self.__stats)
+
+    def reset_stats(self):
+        with self.__stats_lock:
+            for key in self.__stats:
+                self.__stats[key] = 0
+
+    def __count(self, stat):
+        with self.__stats_lock:
+            self.__stats[stat] += 1
+
+    def __get_cache(self):
+        return caches[self.__cache_alias]
+
+    def __get_cache_key(self, username, password):
+        credentials = '{}\0{}'.format(username, password).encode('utf-8')
+        digest = hmac.new(settings.SECRET_KEY.encode('utf-8'), credentials, hashlib.sha256).hexdigest()
+        return '{}:{}'.format(self.__key_prefix, digest)
+
+    def __get_password_digest(self, user):
+        return salted_hmac(self.__key_prefix, user.password).hexdigest()
+
+
+credential_cache = None
+if AUTHENTICATION_CACHE is not None:
+    credential_cache = VerifiedCredentialCache(cache_alias=AUTHENTICATION_CACHE.get('CACHE_ALIAS', 'default'),
+                                               timeout=AUTHENTICATION_CACHE.get('TIMEOUT', 60),
+                                               key_prefix=AUTHENTICATION_CACHE.get('KEY_PREFIX', 'drf_tools.credentials'))
+
+
 class EmailAuthBackend(object):
     """
     Email Authentication Backend
 
     Allows a user to sign in using an email/password pair rather than
     a username/password pair.
+    Verified credentials are cached if AUTHENTICATION_CACHE is configured in the DRF_TOOLS settings.
     """
+    credential_cache = credential_cache
 
-    def authenticate(self, username=None, password=None):
+    def authenticate(self, request=None, username=None, password=None, **kwargs):
         """ Authenticate a user based on email address as the user name. """
-        try:
-            user = User.objects.get(Q(email=username) | Q(username=username))
-            if user.check_password(password):
+        if username is None or password is None:
+            return None
+        if self.credential_cache is not None:
+            user = self.credential_cache.get_user(username, password)
+            if user is not None:
                 return user
-        except User.DoesNotExist:
+        user = self._get_user_by_email_or_username(username)
+        if user is None or not user.check_password(password):
             return None
+        if self.credential_cache is not None:
+            self.credential_cache.set(username, password, user)
+        return user
+
+    @staticmethod
+    def _get_user_by_email_or_username(username):
+        """
+        Looks the user up by the field the username most likely is, the other field is only queried if no user is
+        found. Unlike an OR of both fields, each query can use the index of its field.
+        """
+        fields = ('email', 'username') if '@' in username else ('username', 'email')
+        for field in fields:
+            user = User.objects.filter(**{field: username}).first()
+            if user is not None:
+                return user
+        return None
 
     def get_user(self, user_id):
         """ Get a User object from the user_id. """
@@ -1,5 +1,7 @@
+from django.db.models import Exists, OuterRef
 from django_filters.rest_framework import DjangoFilterBackend
 
+from drf_tools.auth.models import Operation
 from drf_tools.auth.permissions import permission_service
 
 
@@ -15,3 +17,26 @@ class PermissionAwareFilterBackend(DjangoFilterBackend):
         filter_param = permission_service.get_permission_model_filter_param(view.queryset.model)
         return view.filter_queryset_by_permission(
             qs, request.user, request.query_params.get(filter_param))
+
+
+class SubqueryPermissionFiltering(object):
+    """
+    Permission filtering for BusinessPermissionFilteredViewMixin, that restricts the queryset by a correlated EXISTS
+    subquery on the permission model instead of a list of accessible ids, so the database does the join.
+    The accessible permission model instances are taken from permission_service.get_permitted_permission_models(),
+    the path from the filtered model to the permission model from get_permission_model_attr(). Super readers are
+    only unrestricted for the READ operation.
+    """
+
+    def __init__(self, operation=Operation.READ):
+        self.operation = operation
+
+    def filter(self, qs, user, permission_model_id):
+        permission_model_attr = permission_service.get_permission_model_attr(qs.model)
+        if permission_model_id:
+            qs = qs.filter(**{permission_model_attr: permission_model_id})
+        if permission_service.is_super_user(user) or (
+                self.operation == Operation.READ and permission_service.is_super_reader(user)):
+            return qs
+        permitted = permission_service.get_permitted_permission_models(user, self.operation)
+        return qs.filter(Exists(permitted.filter(pk=OuterRef(permission_model_attr))))
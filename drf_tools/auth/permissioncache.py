@@ -0,0 +1,181 @@
+from threading import local, Lock
+
+from django.core.cache import caches
+from django.core.signals import request_started, request_finished
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import Signal
+
+# Must be sent whenever data changes that permission decisions depend on and that isn't an instance of the
+# invalidating models, otherwise revoked permissions are granted from the cache until the timeout expires.
+permissions_changed = Signal()
+
+
+class PermissionDecisionCache(object):
+    """
+    Caches permission decisions for the current request. If a cache alias is given, decisions are additionally shared
+    between requests via the django cache until the timeout expires, permissions_changed is sent or an instance of
+    one of the invalidating_models (e.g. 'app_label.ModelName' of the models holding the permissions) is saved or
+    deleted. Outside of a request only the shared cache is used.
+    """
+
+    def __init__(self, cache_alias=None, timeout=300, key_prefix='drf_tools.permissions', invalidating_models=()):
+        self.__cache_alias = cache_alias
+        self.__timeout = timeout
+        self.__key_prefix = key_prefix
+        self.__request_local = local()
+        self.__stats_lock = Lock()
+        self.__stats = dict(request_hits=0, cache_hits=0, misses=0)
+        request_started.connect(self.__on_request_started, weak=False)
+        request_finished.connect(self.__on_request_finished, weak=False)
+        permissions_changed.connect(self.__on_permissions_changed, weak=False)
+        for model in invalidating_models:
+            post_save.connect(self.__on_permissions_changed, sender=model, weak=False)
+            post_delete.connect(self.__on_permissions_changed, sender=model, weak=False)
+
+    def get(self, key):
+        """Returns the cached decision for key or None"""
+        decisions = self.__get_request_decisions()
+        if decisions is not None and key in decisions:
+            self.__count('request_hits')
+            return decisions[key]
+        if self.__cache_alias is not None:
+            decision = self.__get_cache().get(self.__get_cache_key(key))
+            if decision is not None:
+                if decisions is not None:
+                    decisions[key] = decision
+                self.__count('cache_hits')
+                return decision
+        return None
+
+    def set(self, key, decision):
+        decisions = self.__get_request_decisions()
+        if decisions is not None:
+            decisions[key] = decision
+        if self.__cache_alias is not None:
+            self.__get_cache().set(self.__get_cache_key(key), decision, self.__timeout)
+
+    def get_or_compute(self, key, compute):
+        decision = self.get(key)
+        if decision is None:
+            self.__count('misses')
+            decision = bool(compute())
+            self.set(key, decision)
+        return decision
+
+    def count_miss(self):
+        self.__count('misses')
+
+    def invalidate(self):
+        """Discards all cached decisions, in this process and in the shared cache"""
+        self.clear_request_cache()
+        if self.__cache_alias is not None:
+            cache = self.__get_cache()
+            generation_key = self.__get_generation_key()
+            cache.add(generation_key, 0, None)
+            try:
+                cache.incr(generation_key)
+            except ValueError:  # expired in between
+                cache.set(generation_key, 1, None)
+
+    def clear_request_cache(self):
+        """Discards the decisions of the current request"""
+        if self.__get_request_decisions() is not None:
+            self.__start_request()
+
+    def get_stats(self):
+        with self.__stats_lock:
+            return dict(self.__stats)
+
+    def reset_stats(self):
+        with self.__stats_lock:
+            for key in self.__stats:
+                self.__stats[key] = 0
+
+    def __count(self, stat):
+        with self.__stats_lock:
+            self.__stats[stat] += 1
+
+    def __get_request_decisions(self):
+        """The decisions of the current request, None outside of a request"""
+        return getattr(self.__request_local, 'decisions', None)
+
+    def __start_request(self):
+        self.__request_local.__dict__.clear()
+        self.__request_local.decisions = {}
+
+    def __get_cache(self):
+        return caches[self.__cache_alias]
+
+    def __get_generation_key(self):
+        return '{}:generation'.format(self.__key_prefix)
+
+    def __get_cache_key(self, key):
+        # the generation is read once per request, invalidate() starts a new generation
+        generation = getattr(self.__request_local, 'generation', None)
+        if generation is None:
+            generation = self.__get_cache().get(self.__get_generation_key(), 0)
+            if self.__get_request_decisions() is not None:
+                self.__request_local.generation = generation
+        return '{}:{}:{}'.format(self.__key_prefix, generation, ':'.join(str(k) for k in key))
+
+    def __on_request_started(self, **kwargs):
+        self.__start_request()
+
+    def __on_request_finished(self, **kwargs):
+        self.__request_local.__dict__.clear()
+
+    def __on_permissions_changed(self, **kwargs):
+        self.invalidate()
+
+
+class CachingPermissionService(object):
+    """
+    Wraps a permission service and caches its decisions of has_permission and has_object_permission. All other
+    methods are delegated to the wrapped service.
+    """
+
+    def __init__(self, permission_service, cache_alias=None, timeout=300, key_prefix='drf_tools.permissions',
+                 invalidating_models=()):
+        self.permission_service = permission_service
+        self.cache = PermissionDecisionCache(cache_alias, timeout, key_prefix, invalidating_models)
+
+    def __getattr__(self, name):
+        return getattr(self.permission_service, name)
+
+    def has_permission(self, user, permission_model_id, model, operation, **kwargs):
+        if user.pk is None:
+            return self.permission_service.has_permission(user, permission_model_id, model, operation, **kwargs)
+        key = ('model', user.pk, permission_model_id, model._meta.label_lower, operation.value) + tuple(
+            '{}={}'.format(k, v) for k, v in sorted(kwargs.items()))
+        return self.cache.get_or_compute(key, lambda: self.permission_service.has_permission(
+            user, permission_model_id, model, operation, **kwargs))
+
+    def has_object_permission(self, user, obj, operation):
+        if user.pk is None or obj.pk is None:
+            return self.permission_service.has_object_permission(user, obj, operation)
+        return self.cache.get_or_compute(self.__get_object_key(user, obj, operation),
+                                         lambda: self.permission_service.has_object_permission(user, obj, operation))
+
+    def has_objects_permission(self, user, objs, operation):
+        if user.pk is None:
+            return self.permission_service.has_objects_permission(user, objs, operation)
+        uncached_objs = []
+        for obj in objs:
+            decision = self.cache.get(self.__get_object_key(user, obj, operation)) if obj.pk is not None else None
+            if decision is False:
+                return False
+            if decision is None:
+                uncached_objs.append(obj)
+        if not uncached_objs:
+            return True
+        self.cache.count_miss()
+        if not self.permission_service.has_objects_permission(user, uncached_objs, operation):
+            return False  # we don't know which objects were denied, so nothing is cached
+        for obj in uncached_objs:
+            if obj.pk is not None:
+                self.cache.set(self.__get_object_key(user, obj, operation), True)
+        return True
+
+    @staticmethod
+    def __get_object_key(user, obj, operation):
+        return 'object', user.pk, obj._meta.label_lower, obj.pk, operation.value
@@ -1,21 +1,30 @@
+from collections import OrderedDict
 from copy import copy
 from urllib.parse import urlsplit
 
-from django.conf import settings
-from django.urls import URLResolver, set_urlconf, get_resolver
+from django.urls import URLResolver
 from django.urls.resolvers import RoutePattern
 from django_tooling.moduleloading import load_module
 from drf_hal_json import LINKS_FIELD_NAME
-import drf_nested_routing
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.permissions import BasePermission, SAFE_METHODS
 from rest_framework.request import Request
 from rest_framework.settings import api_settings
 
-from drf_tools.auth import PERMISSION_SERVICE
+from drf_tools.auth import PERMISSION_SERVICE, PERMISSION_CACHE
 from drf_tools.auth.models import Operation
+from drf_tools.auth.permissioncache import CachingPermissionService
+from drf_tools.resolvers import resolve_url, resolve_many
+from drf_tools.timing import timed
 
 permission_service = load_module(PERMISSION_SERVICE)()
+if PERMISSION_CACHE is not None:
+    permission_service = CachingPermissionService(
+        permission_service,
+        cache_alias=PERMISSION_CACHE.get('CACHE_ALIAS'),
+        timeout=PERMISSION_CACHE.get('TIMEOUT', 300),
+        key_prefix=PERMISSION_CACHE.get('KEY_PREFIX', 'drf_tools.permissions'),
+        invalidating_models=PERMISSION_CACHE.get('INVALIDATING_MODELS', ()))
 
 
 def check_base_permissions(request, user):
@@ -44,15 +53,36 @@ class BusinessPermission(BasePermission):
             return True
 
         if request.method == 'POST':
-            permission_model_ids = permission_service.get_permission_model_ids_from_request(request, view)
             if not self._check_links(request):
                 return False
-            for permission_model_id in permission_model_ids:
-                if permission_service.has_permission(user, permission_model_id, view.queryset.model, Operation.CREATE):
-                    return True
+            if isinstance(request.data, list):
+                return self._has_bulk_create_permission(request, view)
+            permission_model_ids = permission_service.get_permission_model_ids_from_request(request, view)
+            return self._has_create_permission(user, view, permission_model_ids)
+
+        return False
 
+    @staticmethod
+    def _has_create_permission(user, view, permission_model_ids):
+        for permission_model_id in permission_model_ids:
+            if permission_service.has_permission(user, permission_model_id, view.queryset.model, Operation.CREATE):
+                return True
         return False
 
+    def _has_bulk_create_permission(self, request, view):
+        """Every resource of a bulk create needs the create permission, equal permission model ids are checked once"""
+        checked_permission_model_ids = set()
+        for data in request.data:
+            if not isinstance(data, dict):
+                return False
+            permission_model_ids = tuple(permission_service.get_permission_model_ids_from_request(request, view, data))
+            if permission_model_ids in checked_permission_model_ids:
+                continue
+            if not self._has_create_permission(request.user, view, permission_model_ids):
+                return False
+            checked_permission_model_ids.add(permission_model_ids)
+        return True
+
     def has_object_permission(self, request, view, obj):
         user = request.user
         if permission_service.is_super_user(user) or (
@@ -63,56 +93,88 @@ class BusinessPermission(BasePermission):
         operation = self._get_operation(request.method)
         return permission_service.has_object_permission(user, obj, operation)
 
+    def has_objects_permission(self, request, view, objs):
+        """Bulk version of has_object_permission for objects of the same model"""
+        user = request.user
+        if permission_service.is_super_user(user) or (
+            permission_service.is_super_reader(user) and request.method in SAFE_METHODS):
+            return True
+        if request.method in ('PUT', 'PATCH') and not self._check_links(request):
+            return False
+        operation = self._get_operation(request.method)
+        return permission_service.has_objects_permission(user, objs, operation)
+
     def _check_links(self, request):
-        if LINKS_FIELD_NAME in request.data:
-            urlconf = settings.ROOT_URLCONF
-            set_urlconf(urlconf)
-            resolver = get_resolver(urlconf)
-            for key, urls in request.data[LINKS_FIELD_NAME].items():
+        with timed('links'):
+            return self.__check_links(request)
+
+    def __check_links(self, request):
+        link_urls = []
+        for data in (request.data if isinstance(request.data, list) else [request.data]):
+            if not isinstance(data, dict) or LINKS_FIELD_NAME not in data:
+                continue
+            for key, urls in data[LINKS_FIELD_NAME].items():
                 if key == api_settings.URL_FIELD_NAME:
                     continue  # we don't check the object itself
                 if not type(urls) is list:
                     urls = [urls]
-                for url in urls:
-                    if not self._can_read_url(request, url, resolver, key):
-                        return False
+                link_urls += [url for url in urls if url is not None]
+        return self._can_read_urls(request, link_urls)
+
+    def _can_read_urls(self, request, urls):
+        """
+        The objects of the linked urls are fetched with resolve_many and their permissions are checked in bulk per
+        target view and parent lookups.
+        """
+        objs_by_url = {}
+        for objs in resolve_many(urls).values():
+            objs_by_url.update(objs)
+
+        groups = OrderedDict()
+        for url in urls:
+            resolved_url = resolve_url(url)
+            obj = objs_by_url[url]
+            if obj is None:
+                raise resolved_url.model.DoesNotExist(url)
+            group_key = (resolved_url.view_cls, tuple(sorted(
+                (k, v) for k, v in resolved_url.lookups.items() if k != resolved_url.lookup_key)))
+            if group_key not in groups:
+                groups[group_key] = (self._make_sub_request(request, url), [])
+            groups[group_key][1].append(obj)
+
+        for (view_cls, _), (sub_request, objs) in groups.items():
+            if not self._has_objects_read_permission(view_cls(), sub_request, objs):
+                return False
         return True
 
-    def _can_read_url(self, request, url, resolver, key):
-        if url is None:
-            return True
-        sub_request = self._make_sub_request(request, url, resolver)
-        view, Model, obj = self._get_view_model_object_for_request(sub_request)
-        if not obj:
-            raise Model.DoesNotExist(url)
+    @staticmethod
+    def _has_objects_read_permission(view, request, objs):
+        """
+        Checks the read permission of the linked objs of one view and parent lookups, override this to customize the
+        link checks (it replaces the former per url hook _can_read_url)
+        """
         try:
-            view.check_permissions(sub_request)
-            view.check_object_permissions(sub_request, obj)
-            return True
+            view.check_permissions(request)
         except PermissionDenied:
             return False
+        for permission in view.get_permissions():
+            if hasattr(permission, 'has_objects_permission'):
+                if not permission.has_objects_permission(request, view, objs):
+                    return False
+            elif not all(permission.has_object_permission(request, view, obj) for obj in objs):
+                return False
+        return True
 
-    def _make_sub_request(self, request, url, resolver):
+    def _make_sub_request(self, request, url):
         wsgi_request = copy(request._request)
         wsgi_request.method = 'GET'
         wsgi_request.path = wsgi_request.path_info = urlsplit(url).path
-        wsgi_request.resolver_match = resolver.resolve(wsgi_request.path_info)
+        wsgi_request.resolver_match = resolve_url(url).resolver_match
         sub_request = Request(wsgi_request)
         sub_request.user = request.user
         sub_request.authenticators = request.authenticators
         return sub_request
 
-    def _get_view_model_object_for_request(self, request):
-        callback, callback_args, callback_kwargs = request.resolver_match
-        ModelCls = callback.cls.queryset.model
-        lookups = {}
-        for k, v in callback_kwargs.items():
-            if k.startswith(drf_nested_routing.PARENT_LOOKUP_NAME_PREFIX):
-                k = k[len(drf_nested_routing.PARENT_LOOKUP_NAME_PREFIX):]
-            lookups[k] = v
-        queryset = ModelCls.objects.filter(**lookups)
-        return callback.cls(), ModelCls, queryset.first()
-
     def _get_operation(self, method):
         if method == "PUT" or method == "PATCH":
             return Operation.UPDATE
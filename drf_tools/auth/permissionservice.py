@@ -5,6 +5,7 @@ from django.db.models.fields.related_descriptors import ForwardOneToOneDescripto
 from drf_hal_json import LINKS_FIELD_NAME, is_hal_content_type
 import drf_nested_routing
 
+from drf_tools.identitymap import identity_map
 from drf_tools.utils import get_id_from_detail_uri
 
 
@@ -33,6 +34,20 @@ class BasePermissionService(object, metaclass=ABCMeta):
     def has_object_permission(self, user, obj, operation):
         pass
 
+    def has_objects_permission(self, user, objs, operation):
+        """
+        Bulk version of has_object_permission for objects of the same model, used when checking linked objects.
+        Implementations should override this to check all objects with as few queries as possible.
+        """
+        return all(self.has_object_permission(user, obj, operation) for obj in objs)
+
+    def get_permitted_permission_models(self, user, operation):
+        """
+        Returns an unevaluated queryset of the permission model instances the user has the operation permission for.
+        Needed by SubqueryPermissionFiltering, which uses it as correlated subquery.
+        """
+        raise NotImplementedError()
+
     @staticmethod
     def is_super_user(user):
         return user.is_superuser
@@ -44,21 +59,23 @@ class BasePermissionService(object, metaclass=ABCMeta):
     def is_valid_model(self, model):
         return self.get_permission_model_attr(model) is not None
 
-    def get_permission_model_ids_from_request(self, request, view):
-        return self._get_permission_model_ids_from_request_data(request, view.queryset.model, view) or \
+    def get_permission_model_ids_from_request(self, request, view, data=None):
+        """data is one resource of a bulk request, by default the request data is used"""
+        return self._get_permission_model_ids_from_request_data(request, view.queryset.model, view, data) or \
                self._get_permission_model_ids_from_query_params(request.query_params, view.queryset.model)
 
     def _get_permission_model_ids_from_query_params(self, query_params, model):
         permission_model_attr = self.get_permission_model_attr(model)
         return query_params.getlist(permission_model_attr + 'Id')
 
-    def _get_permission_model_ids_from_request_data(self, request, model, view):
+    def _get_permission_model_ids_from_request_data(self, request, model, view, data=None):
         if not is_hal_content_type(request.content_type):
             return None
 
+        data = request.data if data is None else data
         permission_model_attr = self.get_permission_model_attr(model)
-        if LINKS_FIELD_NAME in request.data and permission_model_attr in request.data[LINKS_FIELD_NAME]:
-            return [get_id_from_detail_uri(request.data[LINKS_FIELD_NAME][permission_model_attr])]
+        if LINKS_FIELD_NAME in data and permission_model_attr in data[LINKS_FIELD_NAME]:
+            return [get_id_from_detail_uri(data[LINKS_FIELD_NAME][permission_model_attr])]
 
         direct_parent = None
         direct_parent_id = None
@@ -75,8 +92,8 @@ class BasePermissionService(object, metaclass=ABCMeta):
                 return [view.kwargs[kwarg_key]]
             elif '__' in kwarg_key:
                 other_parent = kwarg_key_without_prefix.split('__')[0]
-                if LINKS_FIELD_NAME in request.data and other_parent in request.data[LINKS_FIELD_NAME]:
-                    other_parent_id = get_id_from_detail_uri(request.data[LINKS_FIELD_NAME][other_parent])
+                if LINKS_FIELD_NAME in data and other_parent in data[LINKS_FIELD_NAME]:
+                    other_parent_id = get_id_from_detail_uri(data[LINKS_FIELD_NAME][other_parent])
             else:
                 direct_parent = kwarg_key_without_prefix
                 direct_parent_id = view.kwargs[kwarg_key]
@@ -94,4 +111,18 @@ class BasePermissionService(object, metaclass=ABCMeta):
             parent_cls = parent_attr.field.related_model
         else:
             parent_cls = parent_attr.target_field.model
-        return self.get_permission_model_ids_from_object(parent_cls.objects.get(id=parent_id))
+        parent = identity_map.get(parent_cls, parent_id, self._get_permission_model_id_fields(parent_cls))
+        return self.get_permission_model_ids_from_object(parent)
+
+    def _get_permission_model_id_fields(self, model):
+        """
+        The fields get_permission_model_ids_from_object needs to be loaded, None loads all fields. By default the first
+        field of the path to the permission model.
+        """
+        permission_model_attr = self.get_permission_model_attr(model)
+        if not permission_model_attr:
+            return None
+        field_name = permission_model_attr.split('__')[0]
+        if not any(field.name == field_name for field in model._meta.concrete_fields):
+            return None
+        return 'pk', field_name
@@ -31,6 +31,8 @@ class BusinessPermissionFilteredViewMixin(object):
     queryset = None
     permission_classes = (BusinessPermission,)
     filter_backends = (PermissionAwareFilterBackend,)
+    # e.g. SubqueryPermissionFiltering(), otherwise _get_permission_filtering has to be implemented
+    permission_filtering = None
 
     def filter_queryset_by_permission(self, qs, user, permission_model_id):
         if self.queryset is None:
@@ -39,4 +41,6 @@ class BusinessPermissionFilteredViewMixin(object):
         return self._get_permission_filtering().filter(qs, user, permission_model_id)
 
     def _get_permission_filtering(self):
-        raise NotImplementedError()
+        if self.permission_filtering is None:
+            raise NotImplementedError()
+        return self.permission_filtering
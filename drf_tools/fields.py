@@ -1,4 +1,9 @@
 from rest_framework.fields import CharField
+from rest_framework.relations import PKOnlyObject
+from drf_nested_routing import get_parent_query_lookups_by_view
+from drf_nested_routing.fields import NestedHyperlinkedRelatedField as OriginalNestedHyperlinkedRelatedField
+
+from drf_tools.identitymap import identity_map
 
 
 class FilenameField(CharField):
@@ -7,3 +12,41 @@ class FilenameField(CharField):
         if value:
             value = value.split("/")[-1]
         return value
+
+
+class NestedHyperlinkedRelatedField(OriginalNestedHyperlinkedRelatedField):
+    """
+    Links to resources without parent lookups are built from the pk only, without fetching the linked object.
+    Links to nested resources need the linked object for the parent lookups, so it is taken from the instance, where it
+    can be fetched with select_related/prefetch_related, instead of being queried by pk for every link.
+    Linked objects of request data are taken from the identity map, if they were already loaded by the permission checks
+    and the field's queryset is the unfiltered queryset of the default manager.
+    """
+
+    def use_pk_only_optimization(self):
+        return not self._has_parent_lookups() and super(NestedHyperlinkedRelatedField, self).use_pk_only_optimization()
+
+    def get_url(self, obj, view_name, request, format):
+        if isinstance(obj, PKOnlyObject) and not self._has_parent_lookups():
+            if obj.pk is None:
+                return None
+            return self.reverse(view_name, kwargs={self.lookup_field: obj.pk}, request=request, format=format)
+        return super(NestedHyperlinkedRelatedField, self).get_url(obj, view_name, request, format)
+
+    def get_object(self, view_name, view_args, view_kwargs):
+        queryset = self.get_queryset()
+        if self.lookup_field not in ('pk', queryset.model._meta.pk.name) or not _is_default_queryset(queryset):
+            return super(NestedHyperlinkedRelatedField, self).get_object(view_name, view_args, view_kwargs)
+        return identity_map.get(queryset.model, view_kwargs[self.lookup_url_kwarg])
+
+    def _has_parent_lookups(self):
+        return bool(get_parent_query_lookups_by_view(self.view_name.split("-")[0]))
+
+
+def _is_default_queryset(queryset):
+    """Whether the queryset selects the same as model._default_manager.all(), which the identity map uses"""
+    default_queryset = queryset.model._default_manager.all()
+    if type(queryset) is not type(default_queryset) or queryset.db != default_queryset.db or \
+            queryset.query.is_empty():
+        return False
+    return str(queryset.query) == str(default_queryset.query)
@@ -1,5 +1,10 @@
+from functools import reduce
+import operator
+
 from django.db import models
+from django.db.models import Q
 from django_filters import FilterSet, BooleanFilter
+from django_filters.constants import EMPTY_VALUES
 from django_filters.filters import Filter
 from django import forms
 
@@ -7,6 +12,10 @@ from django import forms
 class ListFilterSet(FilterSet):
     """
     The filterset handles a list of values as filter, that are connected using the OR-Operator
+
+    For plain lookup filters the values are combined in a single lookup (`__in` for exact lookups, otherwise one
+    Q-expression). Filters with a custom method or filter implementation are applied once per value and the resulting
+    querysets are combined.
     """
 
     def filter_queryset(self, queryset):
@@ -20,15 +29,12 @@ class ListFilterSet(FilterSet):
                 value_list = self.data.getlist(name)
 
             if value_list:
-                filtered_qs = None
-                for list_value in value_list:
-                    if isinstance(filter_, BooleanFilter):
-                        list_value = self._str_to_boolean(list_value)
-                    if not filtered_qs:
-                        filtered_qs = filter_.filter(queryset, list_value)
-                    else:
-                        filtered_qs |= filter_.filter(queryset, list_value)
-                queryset = filtered_qs
+                if isinstance(filter_, BooleanFilter):
+                    value_list = [self._str_to_boolean(list_value) for list_value in value_list]
+                if self._is_lookup_filter(filter_):
+                    queryset = self._filter_by_lookup(queryset, filter_, value_list)
+                else:
+                    queryset = self._filter_by_each_value(queryset, filter_, value_list)
             # CUSTOM:END
 
             assert isinstance(queryset, models.QuerySet), \
@@ -36,6 +42,39 @@ class ListFilterSet(FilterSet):
                 % (type(self).__name__, name, type(queryset).__name__)
         return queryset
 
+    @staticmethod
+    def _is_lookup_filter(filter_):
+        """Filters, that don't customize Filter.filter and can be combined in one lookup"""
+        if filter_.method or filter_.exclude:
+            return False
+        return type(filter_).filter in (Filter.filter, EnumFilter.filter)
+
+    @staticmethod
+    def _filter_by_lookup(queryset, filter_, value_list):
+        if isinstance(filter_, EnumFilter):
+            value_list = filter_.get_enum_values(value_list)
+        if any(list_value in EMPTY_VALUES for list_value in value_list):
+            return queryset  # an empty value doesn't filter, so OR-ing it matches everything
+        if filter_.distinct:
+            queryset = queryset.distinct()
+
+        lookup = '{}__{}'.format(filter_.field_name, filter_.lookup_expr)
+        if len(value_list) == 1:
+            return queryset.filter(**{lookup: value_list[0]})
+        if filter_.lookup_expr == 'exact':
+            return queryset.filter(**{filter_.field_name + '__in': value_list})
+        return queryset.filter(reduce(operator.or_, (Q(**{lookup: list_value}) for list_value in value_list)))
+
+    @staticmethod
+    def _filter_by_each_value(queryset, filter_, value_list):
+        filtered_qs = None
+        for list_value in value_list:
+            if filtered_qs is None:
+                filtered_qs = filter_.filter(queryset, list_value)
+            else:
+                filtered_qs |= filter_.filter(queryset, list_value)
+        return filtered_qs
+
     @staticmethod
     def _str_to_boolean(value):
         if value.lower() == "true":
@@ -46,20 +85,64 @@ class ListFilterSet(FilterSet):
 
 
 class EnumFilter(Filter):
-    def __init__(self, enum_type, *args, **kwargs):
+    """
+    Filters by an enum member given by its name or value. The lookup table of an enum type is built once and shared by
+    all filter instances. With case_insensitive=True, names and string values are matched ignoring the case.
+    """
+    _enum_lookups = {}
+
+    def __init__(self, enum_type, *args, case_insensitive=False, **kwargs):
         super(EnumFilter, self).__init__(*args, **kwargs)
         self.enum_type = enum_type
+        self.case_insensitive = case_insensitive
 
     field_class = forms.CharField
 
     def filter(self, qs, value):
         if value in ([], (), {}, None, ''):
             return qs
-        enum_value = None
-        for choice in self.enum_type:
-            if choice.name == value or choice.value == value:
-                enum_value = choice
-                break
-        if enum_value is None:
-            raise ValueError("'{value}' is not a valid value for '{enum}'".format(value=value, enum=self.enum_type.__name__))
-        return super(EnumFilter, self).filter(qs, enum_value)
+        return super(EnumFilter, self).filter(qs, self.get_enum_value(value))
+
+    def get_enum_value(self, value):
+        return self.get_enum_values([value])[0]
+
+    def get_enum_values(self, values):
+        """Resolves all values to enum members, all invalid values are reported in one ValueError"""
+        lookup = self._get_enum_lookup(self.enum_type, self.case_insensitive)
+        enum_values = []
+        invalid_values = []
+        for value in values:
+            if value in EMPTY_VALUES:
+                enum_values.append(value)
+                continue
+            enum_value = lookup.get(self._normalize_lookup_key(value, self.case_insensitive))
+            if enum_value is None:
+                invalid_values.append(value)
+            enum_values.append(enum_value)
+
+        if len(invalid_values) == 1:
+            raise ValueError("'{value}' is not a valid value for '{enum}'".format(value=invalid_values[0],
+                                                                                  enum=self.enum_type.__name__))
+        if invalid_values:
+            raise ValueError("{values} are not valid values for '{enum}'".format(
+                values=", ".join("'{}'".format(value) for value in invalid_values), enum=self.enum_type.__name__))
+        return enum_values
+
+    @classmethod
+    def _get_enum_lookup(cls, enum_type, case_insensitive):
+        key = (enum_type, case_insensitive)
+        lookup = cls._enum_lookups.get(key)
+        if lookup is None:
+            lookup = {}
+            # the first member matching by name or value wins
+            for choice in enum_type:
+                lookup.setdefault(cls._normalize_lookup_key(choice.name, case_insensitive), choice)
+                lookup.setdefault(cls._normalize_lookup_key(choice.value, case_insensitive), choice)
+            cls._enum_lookups[key] = lookup
+        return lookup
+
+    @staticmethod
+    def _normalize_lookup_key(value, case_insensitive):
+        if case_insensitive and isinstance(value, str):
+            return value.lower()
+        return value
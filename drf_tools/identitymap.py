@@ -0,0 +1,107 @@
+from threading import local
+
+from django.core.signals import request_started, request_finished
+
+
+class IdentityMap(object):
+    """
+    Request scoped map of model instances by (model, pk), so an instance that is needed by the permission checks, the
+    link checks and the serializer validation of a request is fetched only once.
+    The map is only active between request_started and request_finished, outside of a request (e.g. in tasks)
+    instances are always fetched.
+    Instances are shared by all callers of a request, so they must not be modified (copy them before). Partially
+    loaded instances (e.g. with only()) are kept apart and only returned to callers asking for loaded fields, the next
+    lookup of the complete instance fetches it and replaces them.
+    """
+
+    def __init__(self):
+        self.__request_local = local()
+        request_started.connect(self.__on_request_started, weak=False)
+        request_finished.connect(self.__on_request_finished, weak=False)
+
+    def activate(self):
+        self.__request_local.instances = {}
+        self.__request_local.partial_instances = {}
+
+    def deactivate(self):
+        self.__request_local.__dict__.clear()
+
+    def is_active(self):
+        return hasattr(self.__request_local, 'instances')
+
+    def get(self, model, pk, fields=None):
+        """
+        Returns the instance of model with the pk, fetched with only(*fields) if fields are given. Only if fields are
+        given a partially loaded instance may be returned, which has at least these fields loaded. Raises
+        model.DoesNotExist like QuerySet.get.
+        """
+        instance = self.__get_loaded(model, pk, fields)
+        if instance is None:
+            queryset = model._default_manager.all()
+            if fields is not None:
+                queryset = queryset.only(*fields)
+            instance = queryset.get(pk=pk)
+            self.add(instance)
+        return instance
+
+    def get_many(self, model, pks):
+        """Returns the existing instances of model for the pks as {str(pk): instance} with at most one query"""
+        instances = {}
+        missing_pks = set()
+        for pk in pks:
+            instance = self.__get_loaded(model, pk, None)
+            if instance is None:
+                missing_pks.add(pk)
+            else:
+                instances[str(pk)] = instance
+        if missing_pks:
+            for instance in model._default_manager.filter(pk__in=missing_pks):
+                self.add(instance)
+                instances[str(instance.pk)] = instance
+        return instances
+
+    def add(self, instance):
+        """
+        Adds the instance to the map. A complete instance replaces a partially loaded one, a partially loaded instance
+        is only kept for lookups of its loaded fields.
+        """
+        if not self.is_active() or instance.pk is None:
+            return
+        key = self.__get_key(type(instance), instance.pk)
+        if not instance.get_deferred_fields():
+            self.__request_local.instances[key] = instance
+            self.__request_local.partial_instances.pop(key, None)
+        elif key not in self.__request_local.instances:
+            self.__request_local.partial_instances[key] = instance
+
+    def __get_loaded(self, model, pk, fields):
+        if not self.is_active():
+            return None
+        key = self.__get_key(model, pk)
+        instance = self.__request_local.instances.get(key)
+        if instance is not None or fields is None:
+            return instance
+        instance = self.__request_local.partial_instances.get(key)
+        if instance is None:
+            return None
+        deferred_fields = instance.get_deferred_fields()
+        if any(self.__get_attname(model, field) in deferred_fields for field in fields):
+            return None
+        return instance
+
+    @staticmethod
+    def __get_attname(model, field):
+        return model._meta.pk.attname if field == 'pk' else model._meta.get_field(field).attname
+
+    @staticmethod
+    def __get_key(model, pk):
+        return model, str(pk)
+
+    def __on_request_started(self, **kwargs):
+        self.activate()
+
+    def __on_request_finished(self, **kwargs):
+        self.deactivate()
+
+
+identity_map = IdentityMap()
@@ -0,0 +1,12 @@
+from logging.handlers import QueueHandler
+
+
+class DeferredFormattingQueueHandler(QueueHandler):
+    """
+    QueueHandler that enqueues records unformatted, so messages and their lazy arguments (e.g. the request and response
+    data logged by RestLoggingMixin) are formatted by the handlers of the QueueListener in its own thread instead of in
+    the request thread. Only suited for in-process queues, as the arguments are neither copied nor pickled.
+    """
+
+    def prepare(self, record):
+        return record
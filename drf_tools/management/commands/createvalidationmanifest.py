@@ -0,0 +1,23 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from drf_tools.validation.registry import validationRegistry
+
+
+class Command(BaseCommand):
+    help = 'Writes the manifest of all validations, which lets the validation registry skip scanning the apps. ' \
+           'Requires drf_tools in INSTALLED_APPS.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help='Path of the manifest, defaults to the setting VALIDATION_MANIFEST')
+
+    def handle(self, *args, **options):
+        manifestPath = options['output'] or getattr(settings, 'VALIDATION_MANIFEST', None)
+        if not manifestPath:
+            raise CommandError('Either pass --output or set VALIDATION_MANIFEST.')
+        manifest = validationRegistry.createManifest()
+        with open(manifestPath, 'w') as manifestFile:
+            json.dump(manifest, manifestFile, indent=2, sort_keys=True)
+        self.stdout.write('Wrote {} validations to {}'.format(len(manifest), manifestPath))
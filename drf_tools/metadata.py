@@ -0,0 +1,29 @@
+from django.core.exceptions import PermissionDenied
+from django.http import Http404
+from rest_framework import exceptions
+from rest_framework.metadata import SimpleMetadata
+from rest_framework.request import clone_request
+
+
+class BulkUpdateMetadata(SimpleMetadata):
+    """
+    A PUT to the list url is a bulk update, there is no object to check the permissions for. So the actions of the
+    list url are determined by the permissions of the view only.
+    """
+
+    def determine_actions(self, request, view):
+        if (view.lookup_url_kwarg or view.lookup_field) in view.kwargs:
+            return super(BulkUpdateMetadata, self).determine_actions(request, view)
+
+        actions = {}
+        for method in {'PUT', 'POST'} & set(view.allowed_methods):
+            view.request = clone_request(request, method)
+            try:
+                view.check_permissions(view.request)
+            except (exceptions.APIException, PermissionDenied, Http404):
+                pass
+            else:
+                actions[method] = self.get_serializer_info(view.get_serializer())
+            finally:
+                view.request = request
+        return actions
@@ -0,0 +1,76 @@
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from drf_hal_json import LINKS_FIELD_NAME, EMBEDDED_FIELD_NAME
+
+
+class HalCursorPagination(CursorPagination):
+    """
+    Keyset pagination with the HAL format of HalPageNumberPagination. Pages are selected by a cursor instead of an
+    offset, so deep pages are as fast as the first one.
+    The ordering is taken from the queryset, if it is already ordered (e.g. by an ordering filter of the filter set),
+    otherwise from the ordering filter backend or the `ordering` attribute. The pk is added as tie breaker.
+    The cursor position is read from the first ordering field, so it must be a non nullable, non relational field of
+    the model. Otherwise (e.g. for an ordering by a related field like 'resource__name') the pages are ordered by pk.
+    The count is only queried if `count=true` is requested.
+    """
+    page_size_query_param = "page_size"
+    max_page_size = 1000000
+    ordering = 'pk'
+    count_query_param = 'count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count = queryset.count() if self.__is_count_requested(request) else None
+        return super(HalCursorPagination, self).paginate_queryset(self.__load_ordering_fields(queryset, request, view),
+                                                                  request, view)
+
+    def get_ordering(self, request, queryset, view):
+        ordering = tuple(queryset.query.order_by)
+        if not ordering or not all(isinstance(field, str) for field in ordering):
+            ordering = super(HalCursorPagination, self).get_ordering(request, queryset, view)
+        if not self.__is_position_field(queryset.model, ordering[0].lstrip('-')):
+            return ('-pk',) if ordering[0].startswith('-') else ('pk',)
+        if not any(field.lstrip('-') in ('pk', queryset.model._meta.pk.name) for field in ordering):
+            ordering += ('pk',)
+        return ordering
+
+    def get_paginated_response(self, data):
+        result = OrderedDict()
+        links = OrderedDict()
+        links[api_settings.URL_FIELD_NAME] = self.base_url
+        links['next'] = self.get_next_link()
+        links['previous'] = self.get_previous_link()
+        result[LINKS_FIELD_NAME] = links
+        if self.count is not None:
+            result['count'] = self.count
+        result['page_size'] = self.page_size
+        result[EMBEDDED_FIELD_NAME] = data
+        return Response(result)
+
+    def __is_count_requested(self, request):
+        return request.query_params.get(self.count_query_param, '').lower() in ('true', '1')
+
+    @staticmethod
+    def __is_position_field(model, field_name):
+        if field_name in ('pk', model._meta.pk.name):
+            return True
+        try:
+            field = model._meta.get_field(field_name)
+        except FieldDoesNotExist:
+            return False  # e.g. lookups of related fields
+        return field.concrete and not field.is_relation and not field.null
+
+    def __load_ordering_fields(self, queryset, request, view):
+        """The cursor position is read from the first ordering field, so it must not be deferred by only()/defer()"""
+        position_field = self.get_ordering(request, queryset, view)[0].lstrip('-')
+        fields, defer = queryset.query.deferred_loading
+        if position_field in ('pk', queryset.model._meta.pk.name) or (defer and position_field not in fields) or \
+                (not defer and position_field in fields):
+            return queryset
+        if defer:
+            return queryset.defer(None).defer(*(fields - {position_field}))
+        return queryset.only(*(fields | {position_field}))
@@ -1,3 +1,12 @@
+import mimetypes
+import os
+import re
+import zipfile
+
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import status
 from rest_framework.renderers import BaseRenderer as OriginalBaseRenderer
 
 from drf_tools.serializers import ZipSerializer, CsvSerializer
@@ -13,11 +22,27 @@ class BaseFileRenderer(OriginalBaseRenderer):
             renderer_context['response']['Content-Disposition'] = 'attachment; filename="{}"'.format(filename)
 
     def _get_filename(self, renderer_context):
-        filename = renderer_context['kwargs'].get(self.KWARGS_KEY_FILENAME)
+        return self._add_format_to_filename(renderer_context['kwargs'].get(self.KWARGS_KEY_FILENAME))
+
+    def _add_format_to_filename(self, filename):
         if filename and self.format and not filename.endswith('.' + self.format):
             filename += "." + self.format
         return filename
 
+    def _get_streaming_response(self, chunks, filename=None):
+        """
+        Wraps the given byte chunks in a StreamingHttpResponse, so that the content is sent to the client while it is
+        generated instead of being rendered completely into memory first
+        """
+        content_type = self.media_type
+        if self.charset:
+            content_type += '; charset={}'.format(self.charset)
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+        filename = self._add_format_to_filename(filename)
+        if filename:
+            response['Content-Disposition'] = 'attachment; filename="{}"'.format(filename)
+        return response
+
 
 class CsvRenderer(BaseFileRenderer):
     media_type = "text/csv"
@@ -28,6 +53,13 @@ class CsvRenderer(BaseFileRenderer):
         self._add_filename_to_response(renderer_context)
         return CsvSerializer.serialize(data, self.separator)
 
+    def stream(self, data, filename=None):
+        """
+        Returns a StreamingHttpResponse for the given rows. data can be any iterable of rows, e.g. a generator or
+        queryset.values_list(...).iterator(), and is consumed lazily while the response is sent.
+        """
+        return self._get_streaming_response(CsvSerializer.serialize_iter(data, self.separator), filename)
+
 
 class XlsxRenderer(BaseFileRenderer):
     media_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
@@ -42,6 +74,12 @@ class XlsxRenderer(BaseFileRenderer):
 
         return XlsxSerializer.serialize(data)
 
+    def stream(self, data, filename=None):
+        """
+        Returns a StreamingHttpResponse for the given rows, which can be any iterable of rows
+        """
+        return self._get_streaming_response(XlsxSerializer.serialize_iter(data), filename)
+
 
 class ZipFileRenderer(BaseFileRenderer):
     """
@@ -58,13 +96,27 @@ class ZipFileRenderer(BaseFileRenderer):
         self._add_filename_to_response(renderer_context)
         return ZipSerializer.serialize(data)
 
+    def stream(self, data, filename=None, compression=zipfile.ZIP_STORED, compresslevel=None):
+        """
+        Returns a StreamingHttpResponse, that writes the zip file while it is sent. data is a dict of filename->member,
+        see ZipSerializer.serialize_iter for the supported members.
+        """
+        return self._get_streaming_response(ZipSerializer.serialize_iter(data, compression, compresslevel), filename)
+
 
 class AnyFileFromSystemRenderer(BaseFileRenderer):
     """
     Given the full file path, the file is opened, read and returned
+
+    For large files file_response should be used instead, which returns a response streaming the file. If
+    sendfile_header is set ('X-Sendfile' or 'X-Accel-Redirect'), sending the file is delegated to the front proxy.
     """
     media_type = '*/*'
     render_style = 'binary'
+    sendfile_header = None
+    chunk_size = 64 * 1024
+
+    _RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
 
     def render(self, data, accepted_media_type=None, renderer_context=None):
         if renderer_context['response'].status_code != 200:
@@ -74,3 +126,89 @@ class AnyFileFromSystemRenderer(BaseFileRenderer):
             with open(data, "rb") as file:
                 return file.read()
         return data
+
+    def file_response(self, request, path, filename=None):
+        """
+        Returns a response for the file at the given path without reading it into memory. Conditional requests
+        (ETag/Last-Modified derived from the file stat) and single byte range requests are supported.
+        """
+        stat = os.stat(path)
+        etag = '"{:x}-{:x}"'.format(int(stat.st_mtime), stat.st_size)
+        last_modified = int(stat.st_mtime)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = self._get_file_content_response(request, path, stat.st_size, etag)
+
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        response['Accept-Ranges'] = 'bytes'
+        filename = self._add_format_to_filename(filename)
+        if filename and response.status_code in (200, 206):
+            response['Content-Disposition'] = 'attachment; filename="{}"'.format(filename)
+        return response
+
+    def _get_file_content_response(self, request, path, size, etag):
+        content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        if self.sendfile_header:
+            response = HttpResponse(content_type=content_type)
+            response[self.sendfile_header] = self._get_sendfile_location(path)
+            return response
+
+        byte_range = self._get_byte_range(request, size, etag)
+        if byte_range is None:
+            return FileResponse(open(path, 'rb'), content_type=content_type)
+        if byte_range is False:
+            response = HttpResponse(status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+            response['Content-Range'] = 'bytes */{}'.format(size)
+            return response
+
+        start, end = byte_range
+        response = StreamingHttpResponse(self._read_file_range(path, start, end), content_type=content_type,
+                                         status=status.HTTP_206_PARTIAL_CONTENT)
+        response['Content-Range'] = 'bytes {}-{}/{}'.format(start, end, size)
+        response['Content-Length'] = end - start + 1
+        return response
+
+    def _get_sendfile_location(self, path):
+        """
+        The value of the sendfile header, which is the path itself for X-Sendfile. For X-Accel-Redirect this has to be
+        overwritten to return the internal location of the file.
+        """
+        return path
+
+    def _get_byte_range(self, request, size, etag):
+        """
+        Returns the (start, end) tuple of the requested range, None if the whole file should be sent or False if the
+        range can't be satisfied. Multiple ranges are not supported, in that case the whole file is sent.
+        """
+        range_header = request.META.get('HTTP_RANGE')
+        if not range_header:
+            return None
+        if_range = request.META.get('HTTP_IF_RANGE')
+        if if_range and if_range != etag:
+            return None
+        match = self._RANGE_PATTERN.match(range_header.strip())
+        if not match or match.group(1) == match.group(2) == '':
+            return None
+
+        if match.group(1) == '':
+            # suffix range with the count of the last bytes
+            start = max(size - int(match.group(2)), 0)
+            end = size - 1
+        else:
+            start = int(match.group(1))
+            end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+        if start >= size or start > end:
+            return False
+        return start, end
+
+    def _read_file_range(self, path, start, end):
+        with open(path, 'rb') as file:
+            file.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = file.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
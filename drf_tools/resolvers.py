@@ -0,0 +1,87 @@
+from collections import OrderedDict, namedtuple
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db.models import Model
+from django.urls import set_urlconf, get_resolver
+import drf_nested_routing
+
+from drf_tools import utils
+from drf_tools.identitymap import identity_map
+
+RESOLVED_URL_CACHE_SIZE = 10000
+
+ResolvedUrl = namedtuple('ResolvedUrl', ['resolver_match', 'view_cls', 'model', 'lookups', 'lookup_key'])
+
+_resolved_urls = utils.LRUCache(RESOLVED_URL_CACHE_SIZE)
+
+
+def get_lookups(callback_kwargs):
+    """Returns the queryset lookups for the kwargs of a resolved url, without the parent lookup prefix"""
+    lookups = {}
+    for k, v in callback_kwargs.items():
+        if k.startswith(drf_nested_routing.PARENT_LOOKUP_NAME_PREFIX):
+            k = k[len(drf_nested_routing.PARENT_LOOKUP_NAME_PREFIX):]
+        lookups[k] = v
+    return lookups
+
+
+def resolve_url(url):
+    """
+    Resolves the path of url against the root urlconf. The result is cached, so the returned lookups must not be
+    modified.
+    """
+    urlconf = settings.ROOT_URLCONF
+    set_urlconf(urlconf)
+    path = urlsplit(url).path
+    return _resolved_urls.get_or_create((urlconf, path), lambda: _resolve_path(urlconf, path))
+
+
+def _resolve_path(urlconf, path):
+    resolver_match = get_resolver(urlconf).resolve(path)
+    view_cls = resolver_match.func.cls
+    lookups = get_lookups(resolver_match.kwargs)
+    lookup_key = view_cls.lookup_url_kwarg or view_cls.lookup_field
+    return ResolvedUrl(resolver_match, view_cls, view_cls.queryset.model, lookups,
+                       lookup_key if lookup_key in lookups else None)
+
+
+def resolve_many(urls):
+    """
+    Returns the objects for the given urls as {model: {url: object or None}}. Detail urls of the same model and
+    parent lookups are fetched with one query, objects of urls without parent lookups are taken from the identity map.
+    """
+    objs_by_model = OrderedDict()
+    groups = OrderedDict()
+    for url in urls:
+        resolved_url = resolve_url(url)
+        objs = objs_by_model.setdefault(resolved_url.model, OrderedDict())
+        if not issubclass(resolved_url.model, Model):
+            objs[url] = None
+            continue
+        if resolved_url.lookup_key is None:
+            objs[url] = resolved_url.model.objects.filter(**resolved_url.lookups).first()
+            if objs[url] is not None:
+                identity_map.add(objs[url])
+            continue
+        parent_lookups = tuple(sorted((k, v) for k, v in resolved_url.lookups.items() if k != resolved_url.lookup_key))
+        group = groups.setdefault((resolved_url.model, resolved_url.lookup_key, parent_lookups), OrderedDict())
+        group[url] = str(resolved_url.lookups[resolved_url.lookup_key])
+
+    for (model, lookup_key, parent_lookups), lookup_values_by_url in groups.items():
+        if not parent_lookups and lookup_key in ('pk', model._meta.pk.name):
+            objs_by_lookup_value = identity_map.get_many(model, set(lookup_values_by_url.values()))
+        else:
+            queryset = model.objects.filter(**{lookup_key + '__in': set(lookup_values_by_url.values())},
+                                            **dict(parent_lookups))
+            objs_by_lookup_value = {}
+            for obj in queryset:
+                identity_map.add(obj)
+                objs_by_lookup_value[str(getattr(obj, lookup_key))] = obj
+        for url, lookup_value in lookup_values_by_url.items():
+            objs_by_model[model][url] = objs_by_lookup_value.get(lookup_value)
+    return objs_by_model
+
+
+def clear_resolved_url_cache():
+    _resolved_urls.clear()
@@ -1,6 +1,10 @@
 from collections import OrderedDict
+from hashlib import md5
+import re
+from urllib.parse import urlsplit, urlunsplit
 
-from django.urls import NoReverseMatch
+from django.urls import NoReverseMatch, get_script_prefix, get_urlconf
+from django.utils.cache import get_conditional_response, patch_cache_control
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.reverse import reverse
@@ -9,33 +13,80 @@ from rest_framework.views import APIView
 
 from drf_nested_routing.routers import NestedRouterMixin
 
+from drf_tools.views import warm_up_serializer_classes
+
 
 class NestedRouterWithExtendedRootView(NestedRouterMixin, DefaultRouter):
     """
-    Router that handles nested routes and additionally adds given api_view_urls to the ApiRootView (the api entrypoint)
+    Router that handles nested routes and additionally adds given api_view_urls to the ApiRootView (the api entrypoint).
+    A PUT to the list url is routed to bulk_update, if the viewset provides it.
     """
-    def __init__(self, api_view_urls):
+    routes = [DefaultRouter.routes[0]._replace(mapping=dict(DefaultRouter.routes[0].mapping, put='bulk_update'))] + \
+        DefaultRouter.routes[1:]
+
+    def __init__(self, api_view_urls, api_root_max_age=None):
+        """
+        api_root_max_age is sent as max-age of the api root, if None clients have to revalidate it (via ETag)
+        """
         self.__api_view_urls = api_view_urls
+        self.__api_root_max_age = api_root_max_age
         super(NestedRouterWithExtendedRootView, self).__init__()
 
+    def warm_up_serializer_classes(self):
+        """Creates the generated serializer classes of all registered viewsets, e.g. from AppConfig.ready"""
+        warm_up_serializer_classes(viewset for prefix, viewset, basename in self.registry)
+
     def get_api_root_view(self, api_urls=None):
-        api_root_routes = {}
+        api_root_routes = OrderedDict()
         list_name = self.routes[0].name
         for prefix, viewset, basename in self.registry:
             api_root_routes[prefix] = list_name.format(basename=basename)
 
         api_view_urls = self.__api_view_urls
+        api_root_max_age = self.__api_root_max_age
 
         class ApiRootView(APIView):
-
+            """
+            The links are reversed with the request once per urlconf, script prefix, version and format (the urlconf is
+            still loading when the view is created) and kept relative, requests only add scheme and host.
+            """
             permission_classes = (AllowAny,)
+            relative_links_cache = {}
 
             def get(self, request, *args, **kwargs):
+                relative_links, links_hash = self._get_relative_links(request, kwargs.get('format', None))
+                etag = '"{}"'.format(md5('{}|{}|{}'.format(
+                    links_hash, request.build_absolute_uri('/'), request.accepted_media_type).encode()).hexdigest())
+                response = get_conditional_response(request, etag=etag)
+                if response is None:
+                    links = OrderedDict()
+                    for group, group_links in relative_links.items():
+                        links[group] = OrderedDict(
+                            (key, request.build_absolute_uri(url)) for key, url in group_links.items())
+                    response = Response({"_links": links})
+                response['ETag'] = etag
+                if api_root_max_age is None:
+                    patch_cache_control(response, no_cache=True)
+                else:
+                    patch_cache_control(response, max_age=api_root_max_age)
+                return response
+
+            @classmethod
+            def _get_relative_links(cls, request, format):
+                cache_key = (get_urlconf(), get_script_prefix(), request.version, format)
+                if cache_key not in cls.relative_links_cache:
+                    relative_links = cls._reverse_relative_links(request, format)
+                    links_hash = md5(repr(relative_links).encode()).hexdigest()
+                    cls.relative_links_cache[cache_key] = relative_links, links_hash
+                return cls.relative_links_cache[cache_key]
+
+            @classmethod
+            def _reverse_relative_links(cls, request, format):
                 links = OrderedDict()
                 links['viewsets'] = OrderedDict()
                 for key, url_name in api_root_routes.items():
                     try:
-                        links['viewsets'][key] = reverse(url_name, request=request, format=kwargs.get('format', None))
+                        links['viewsets'][key] = cls._reverse_relative(url_name, request, format)
                     except NoReverseMatch:
                         continue
 
@@ -43,15 +94,18 @@ class NestedRouterWithExtendedRootView(NestedRouterMixin, DefaultRouter):
                 for api_view_url in api_view_urls:
                     url_name = api_view_url.name
                     try:
-                        if '<pk>' in api_view_url._regex:
-                            links['views'][url_name] = reverse(url_name, request=request,
-                                                              format=kwargs.get('format', None), args=(0,))
+                        if re.search(r'<(\w+:)?pk>', str(api_view_url.pattern)):
+                            links['views'][url_name] = cls._reverse_relative(url_name, request, format, args=(0,))
                         else:
-                            links['views'][url_name] = reverse(url_name, request=request,
-                                                              format=kwargs.get('format', None))
+                            links['views'][url_name] = cls._reverse_relative(url_name, request, format)
                     except NoReverseMatch as e:
                         continue
+                return links
 
-                return Response({"_links": links})
+            @staticmethod
+            def _reverse_relative(url_name, request, format, args=None):
+                """Reverses with the request (so its versioning scheme applies) and strips scheme and host"""
+                url = urlsplit(reverse(url_name, args=args, request=request, format=format))
+                return urlunsplit(('', '', url.path, url.query, url.fragment))
 
         return ApiRootView().as_view()
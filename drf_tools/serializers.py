@@ -1,30 +1,40 @@
+import codecs
 import csv
+from datetime import date, datetime, time
+from decimal import Decimal
 from io import BytesIO
+from itertools import chain
+import os
+from tempfile import TemporaryFile
 import zipfile
 
 from chardet.universaldetector import UniversalDetector
 from openpyxl import Workbook, load_workbook
-from openpyxl.cell import cell
 from rest_framework.serializers import HyperlinkedModelSerializer
 from drf_enum_field.serializers import EnumFieldSerializerMixin
 from drf_hal_json.serializers import HalModelSerializer, HalEmbeddedSerializer
 from drf_nested_routing.serializers import NestedRoutingSerializerMixin
 
+from drf_tools.fields import NestedHyperlinkedRelatedField
+
 
 class HalNestedRoutingEmbeddedSerializer(NestedRoutingSerializerMixin, EnumFieldSerializerMixin, HalEmbeddedSerializer):
-    pass
+    serializer_related_field = NestedHyperlinkedRelatedField
 
 
 class HalNestedRoutingLinksSerializer(NestedRoutingSerializerMixin, EnumFieldSerializerMixin, HyperlinkedModelSerializer):
-    pass
+    serializer_related_field = NestedHyperlinkedRelatedField
 
 
 class HalNestedFieldsModelSerializer(NestedRoutingSerializerMixin, EnumFieldSerializerMixin, HalModelSerializer):
+    serializer_related_field = NestedHyperlinkedRelatedField
     links_serializer_class = HalNestedRoutingLinksSerializer
     embedded_serializer_class = HalNestedRoutingEmbeddedSerializer
 
 
 class CsvSerializer(object):
+    STREAM_CHUNK_SIZE = 64 * 1024
+
     @staticmethod
     def serialize(data, separator='\t'):
         if isinstance(data, bytes):
@@ -33,45 +43,116 @@ class CsvSerializer(object):
         if not isinstance(data, list):
             data = [str(data)]
 
-        csv_buffer = BytesIO()
+        return b''.join(CsvSerializer.serialize_iter(data, separator))
+
+    @staticmethod
+    def serialize_iter(data, separator='\t', chunk_size=STREAM_CHUNK_SIZE):
+        """
+        Generator version of serialize: rows are taken from any iterable (e.g. a generator or queryset.iterator()) and
+        the encoded csv is yielded in chunks of roughly chunk_size bytes, so the whole file never has to be in memory.
+        """
+        if isinstance(data, bytes):
+            yield data
+            return
+
+        if isinstance(data, str):
+            data = [data]
+
+        chunk = []
+        chunk_length = 0
         for row in data:
             if not isinstance(row, (list, tuple)):
                 row = [row]
-            csv_buffer.write((separator.join(CsvSerializer.__validate_cell(cell) for cell in row) + '\n').encode('utf-8'))
-
-        return csv_buffer.getvalue()
+            line = (separator.join(CsvSerializer.__validate_cell(cell) for cell in row) + '\n').encode('utf-8')
+            chunk.append(line)
+            chunk_length += len(line)
+            if chunk_length >= chunk_size:
+                yield b''.join(chunk)
+                chunk = []
+                chunk_length = 0
+        if chunk:
+            yield b''.join(chunk)
 
     @staticmethod
     def deserialize(file_bytes):
         try:
             file_string = file_bytes.decode('utf-8')
         except UnicodeDecodeError as ude:
-            detector = UniversalDetector()
-            for line in BytesIO(file_bytes):
-                detector.feed(line)
-                if detector.done:
-                    break
-            detector.close()
-            if detector.result['confidence'] < 0.5:
-                raise ValueError("Failed to guess the encoding of the file (it's not utf-8). Use utf-8 encoded files.")
+            encoding = CsvSerializer.__guess_encoding(file_bytes)
             try:
-                file_string = file_bytes.decode(detector.result['encoding'])
+                file_string = file_bytes.decode(encoding)
             except UnicodeDecodeError:
-                raise ValueError("Failed to guess the encoding of the file (it's not utf-8). Use utf-8 encoded files. "
-                                 "(The invalid character is '{char:#x}' at {pos})".format(pos=ude.start,
-                                                                                          char=file_bytes[ude.start]))
+                raise CsvSerializer.__create_encoding_error(ude.start, file_bytes[ude.start])
         csv_lines = file_string.splitlines()
-        first_line = csv_lines[:1]
-        first_row_tab = next(csv.reader(first_line, delimiter="\t"))
-        first_row_semicolon = next(csv.reader(first_line, delimiter=";"))
+        return csv.reader(csv_lines, delimiter=CsvSerializer.__get_delimiter(csv_lines[:1]))
+
+    @staticmethod
+    def iter_rows(file, prefix_size=STREAM_CHUNK_SIZE, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        Streaming version of deserialize working on a binary file object. Encoding and delimiter are detected from the
+        first prefix_size bytes, the remaining bytes are decoded incrementally in chunks of chunk_size bytes, so that
+        the file is read only once and never held in memory as a whole.
+        Encoding and delimiter errors are raised immediately, decoding errors later in the file when they are reached.
+        """
+        prefix = file.read(prefix_size)
+        try:
+            codecs.getincrementaldecoder('utf-8')().decode(prefix, final=len(prefix) < prefix_size)
+            encoding = 'utf-8'
+        except UnicodeDecodeError:
+            encoding = CsvSerializer.__guess_encoding(prefix)
+
+        lines = CsvSerializer.__iter_decoded_lines(file, prefix, encoding, chunk_size)
+        first_line = next(lines, '')
+        delimiter = CsvSerializer.__get_delimiter([first_line])
+        return csv.reader(chain([first_line], lines), delimiter=delimiter)
+
+    @staticmethod
+    def __iter_decoded_lines(file, prefix, encoding, chunk_size):
+        decoder = codecs.getincrementaldecoder(encoding)()
+        position = 0
+        rest = ''
+        chunk = prefix
+        while True:
+            final = not chunk
+            try:
+                lines = (rest + decoder.decode(chunk, final=final)).splitlines(True)
+            except UnicodeDecodeError as ude:
+                invalid_position = position - len(decoder.getstate()[0]) + ude.start
+                raise CsvSerializer.__create_encoding_error(invalid_position, ude.object[ude.start])
+            position += len(chunk)
+            # the last line might be incomplete, it is completed with the next chunk
+            rest = lines.pop() if lines and not final else ''
+            yield from lines
+            if final:
+                return
+            chunk = file.read(chunk_size)
+
+    @staticmethod
+    def __guess_encoding(file_bytes):
+        detector = UniversalDetector()
+        for line in BytesIO(file_bytes):
+            detector.feed(line)
+            if detector.done:
+                break
+        detector.close()
+        if detector.result['confidence'] < 0.5:
+            raise ValueError("Failed to guess the encoding of the file (it's not utf-8). Use utf-8 encoded files.")
+        return detector.result['encoding']
+
+    @staticmethod
+    def __create_encoding_error(position, char):
+        return ValueError("Failed to guess the encoding of the file (it's not utf-8). Use utf-8 encoded files. "
+                          "(The invalid character is '{char:#x}' at {pos})".format(pos=position, char=char))
+
+    @staticmethod
+    def __get_delimiter(first_line):
+        first_row_tab = next(csv.reader(first_line, delimiter="\t"), [])
+        first_row_semicolon = next(csv.reader(first_line, delimiter=";"), [])
         if len(first_row_tab) > 1:
-            rows = csv.reader(csv_lines, delimiter="\t")
+            return "\t"
         elif len(first_row_semicolon) > 1:
-            rows = csv.reader(csv_lines, delimiter=";")
-        else:
-            raise ValueError("Csv file is not delimited by ';' or 'tab'")
-
-        return rows
+            return ";"
+        raise ValueError("Csv file is not delimited by ';' or 'tab'")
 
     @staticmethod
     def __validate_cell(cell):
@@ -82,7 +163,68 @@ class CsvSerializer(object):
         return cell
 
 
+class ZipMember(object):
+    """
+    A member of a streamed zip file. data can be bytes, a str, which is encoded as utf-8, or an iterable of bytes, e.g.
+    the result of CsvSerializer.serialize_iter. Files are added with path instead of data. compression and
+    compresslevel override the defaults given to ZipSerializer.serialize_iter.
+    """
+
+    def __init__(self, data=None, compression=None, compresslevel=None, path=None):
+        if (data is None) == (path is None):
+            raise ValueError("Either data or path has to be given.")
+        self.data = data.encode('utf-8') if isinstance(data, str) else data
+        self.path = path
+        self.compression = compression
+        self.compresslevel = compresslevel
+
+    def get_size(self):
+        if self.path is not None:
+            return os.path.getsize(self.path)
+        if isinstance(self.data, bytes):
+            return len(self.data)
+        return None
+
+    def iter_chunks(self, chunk_size):
+        if self.path is not None:
+            with open(self.path, 'rb') as file:
+                chunk = file.read(chunk_size)
+                while chunk:
+                    yield chunk
+                    chunk = file.read(chunk_size)
+        elif isinstance(self.data, bytes):
+            yield self.data
+        else:
+            yield from self.data
+
+
+class ZipOutputStream(object):
+    """
+    Write-only, unseekable file object collecting the bytes written by zipfile until they are popped
+    """
+
+    def __init__(self):
+        self.__chunks = []
+        self.size = 0
+
+    def write(self, data):
+        self.__chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self.__chunks)
+        self.__chunks = []
+        self.size = 0
+        return data
+
+
 class ZipSerializer(object):
+    STREAM_CHUNK_SIZE = 64 * 1024
+
     @staticmethod
     def serialize(data):
         byte_buffer = BytesIO()
@@ -94,36 +236,108 @@ class ZipSerializer(object):
         zip_file.close()
         return byte_buffer.getvalue()
 
+    @staticmethod
+    def serialize_iter(data, compression=zipfile.ZIP_STORED, compresslevel=None, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        Writes the given dict of filename->member as zip file and yields the archive in chunks of roughly chunk_size
+        bytes while it is written. Members can be bytes, str, iterables of bytes or ZipMember instances (e.g. with the
+        path of a file), they are compressed on the fly and only one chunk of a member is held in memory at a time.
+        """
+        output_stream = ZipOutputStream()
+        with zipfile.ZipFile(output_stream, 'w', compression=compression, compresslevel=compresslevel) as zip_file:
+            for filename, member in data.items():
+                if not isinstance(member, ZipMember):
+                    member = ZipMember(member)
+                # members are opened by name, so they are compressed with the compression settings of the zip file
+                zip_file.compression = member.compression if member.compression is not None else compression
+                zip_file.compresslevel = member.compresslevel if member.compresslevel is not None else compresslevel
+                size = member.get_size()
+                # without a known size, zip64 extensions are needed in case the member exceeds 2 GB
+                force_zip64 = size is None or size * 1.05 > zipfile.ZIP64_LIMIT
+                with zip_file.open(filename, 'w', force_zip64=force_zip64) as member_file:
+                    for member_chunk in member.iter_chunks(chunk_size):
+                        member_file.write(member_chunk)
+                        if output_stream.size >= chunk_size:
+                            yield output_stream.pop()
+        yield output_stream.pop()
+
 
 class XlsxSerializer(object):
+    STREAM_CHUNK_SIZE = 64 * 1024
+    NATIVE_TYPES = (bool, int, float, Decimal, date, time)
+
     @staticmethod
     def serialize(data):
-        workbook = Workbook()
-        sheet = workbook.active
-        for row_index, row in enumerate(data):
-            for column_index, value in enumerate(row):
-                data_type = cell.TYPE_STRING
-                if isinstance(value, (int, float)):
-                    data_type = cell.TYPE_NUMERIC
-                if data_type == cell.TYPE_STRING:
-                    value = str(value)
-                sheet.cell(column=column_index + 1, row=row_index + 1).set_explicit_value(value, data_type=data_type)
-        xlsx_file = BytesIO()
-        workbook.save(xlsx_file)
-        return xlsx_file.getvalue()
+        with XlsxSerializer.__serialize_to_temporary_file(data) as xlsx_file:
+            return xlsx_file.read()
+
+    @staticmethod
+    def serialize_iter(data, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        Generator version of serialize, the created file is yielded in chunks of chunk_size bytes
+        """
+        with XlsxSerializer.__serialize_to_temporary_file(data) as xlsx_file:
+            chunk = xlsx_file.read(chunk_size)
+            while chunk:
+                yield chunk
+                chunk = xlsx_file.read(chunk_size)
+
+    @staticmethod
+    def __serialize_to_temporary_file(data):
+        """
+        Rows are appended to a write-only workbook, which keeps memory usage constant regardless of the row count.
+        The workbook is saved to a temporary file which is returned rewound.
+        """
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        for row in data:
+            sheet.append([XlsxSerializer.__to_cell_value(value) for value in row])
+        xlsx_file = TemporaryFile()
+        try:
+            workbook.save(xlsx_file)
+            xlsx_file.seek(0)
+        except Exception:
+            xlsx_file.close()
+            raise
+        return xlsx_file
+
+    @staticmethod
+    def __to_cell_value(value):
+        if isinstance(value, XlsxSerializer.NATIVE_TYPES) and not (isinstance(value, (datetime, time)) and value.tzinfo):
+            return value
+        return str(value)
 
     @staticmethod
     def deserialize(file_bytes, sheet_name):
-        workbook = load_workbook(filename=BytesIO(file_bytes), data_only=True)
+        return list(XlsxSerializer.iter_rows(BytesIO(file_bytes), sheet_name))
+
+    @staticmethod
+    def iter_rows(file, sheet_name):
+        """
+        Generator over the row values of the sheet of the given file object, which is opened in read-only mode, so that
+        neither the file content nor all rows have to be loaded into memory. The workbook is only opened once the
+        iteration starts and closed when the generator is exhausted or closed, an invalid sheet name raises a ValueError
+        on the first iteration.
+        """
+        workbook = load_workbook(filename=file, read_only=True, data_only=True)
+        try:
+            worksheet = XlsxSerializer.__get_worksheet(workbook, sheet_name)
+            for row in worksheet.iter_rows(values_only=True):
+                yield list(row)
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def __get_worksheet(workbook, sheet_name):
         if len(workbook.worksheets) > 1:
             if not sheet_name:
                 raise ValueError("The uploaded file contains several sheets. The name of the sheet to be imported "
                                  "needs to be specified with the 'sheetName' parameter.")
-            worksheet = workbook.get_sheet_by_name(sheet_name)
+            worksheet = workbook[sheet_name] if sheet_name in workbook.sheetnames else None
         else:
-            worksheet = workbook.get_active_sheet()
+            worksheet = workbook.active
 
         if not worksheet:
             raise ValueError("No worksheet found.")
+        return worksheet
 
-        return [[c.value for c in row] for row in worksheet.rows]
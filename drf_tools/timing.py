@@ -0,0 +1,140 @@
+from collections import OrderedDict
+from contextlib import ExitStack
+from threading import local
+import logging
+import socket
+import time
+
+from django.db import connections
+from django.dispatch import Signal
+
+logger = logging.getLogger(__name__)
+
+# sent after every request of a RequestTimingMixin view with request, response and timings, the timings are
+# {phase: (duration in ms, query count)}
+request_timed = Signal()
+
+_current = local()
+
+
+class RequestTimings(object):
+    """Durations and query counts of the phases of one request, repeated phases are summed up"""
+
+    def __init__(self):
+        self.start_time = time.monotonic()
+        self.queries = 0
+        self.__phases = OrderedDict()
+
+    def start_phase(self, name):
+        return _Phase(self, name).start()
+
+    def add(self, name, duration_ms, queries):
+        phase = self.__phases.setdefault(name, [0.0, 0])
+        phase[0] += duration_ms
+        phase[1] += queries
+
+    def get_phases(self):
+        """Returns {phase: (duration in ms, query count)} including the phase 'total'"""
+        phases = OrderedDict((name, tuple(phase)) for name, phase in self.__phases.items())
+        phases['total'] = ((time.monotonic() - self.start_time) * 1000, self.queries)
+        return phases
+
+
+class _Phase(object):
+    __slots__ = ('timings', 'name', 'start_time', 'start_queries')
+
+    def __init__(self, timings, name):
+        self.timings = timings
+        self.name = name
+
+    def start(self):
+        self.start_time = time.monotonic()
+        self.start_queries = self.timings.queries
+        return self
+
+    def stop(self):
+        self.timings.add(self.name, (time.monotonic() - self.start_time) * 1000,
+                         self.timings.queries - self.start_queries)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+class _NoPhase(object):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+_NO_PHASE = _NoPhase()
+
+
+def timed(name):
+    """
+    Context manager that adds the duration and query count of its block to the phase name of the current request.
+    Outside of a timed request it does nothing.
+    """
+    timings = getattr(_current, 'timings', None)
+    if timings is None:
+        return _NO_PHASE
+    return _Phase(timings, name)
+
+
+def start_request_timing():
+    """
+    Starts the timing of the current request in this thread and returns its timings. The queries are counted by an
+    execute wrapper of every connection until stop_request_timing.
+    """
+    query_counting = ExitStack()
+    for connection in connections.all():
+        query_counting.enter_context(connection.execute_wrapper(_count_query))
+    _current.query_counting = query_counting
+    _current.timings = RequestTimings()
+    return _current.timings
+
+
+def stop_request_timing(timings):
+    if getattr(_current, 'timings', None) is timings:
+        del _current.timings
+        _current.query_counting.close()
+        del _current.query_counting
+
+
+def _count_query(execute, sql, params, many, context):
+    timings = getattr(_current, 'timings', None)
+    if timings is not None:
+        timings.queries += 1
+    return execute(sql, params, many, context)
+
+
+def get_server_timing_header(phases):
+    return ', '.join('{};dur={:.1f};desc="{} queries"'.format(name, duration_ms, queries)
+                     for name, (duration_ms, queries) in phases.items())
+
+
+class StatsdMetricsSink(object):
+    """
+    Sends the timings of requests via UDP in the statsd format, as timer '<prefix>.<view>.<phase>' and as gauge
+    '<prefix>.<view>.<phase>.queries'. Failures to send are only logged.
+    """
+
+    def __init__(self, host='localhost', port=8125, prefix='drf_tools'):
+        self.__address = (host, port)
+        self.__prefix = prefix
+        self.__socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def send(self, view_name, phases):
+        metric_prefix = '{}.{}'.format(self.__prefix, view_name)
+        lines = []
+        for name, (duration_ms, queries) in phases.items():
+            lines.append('{}.{}:{:.3f}|ms'.format(metric_prefix, name, duration_ms))
+            lines.append('{}.{}.queries:{}|g'.format(metric_prefix, name, queries))
+        try:
+            self.__socket.sendto('\n'.join(lines).encode('utf-8'), self.__address)
+        except OSError:
+            logger.warning("Sending request timings to %s:%s failed", *self.__address, exc_info=True)
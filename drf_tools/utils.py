@@ -1,9 +1,13 @@
+from collections import OrderedDict
+from threading import RLock
+
 from django.core.exceptions import ValidationError
 from django.core.validators import URLValidator
 
 DATETIME_FORMAT = '%d.%m.%Y %H:%M:%S'
 DATETIME_FORMAT_ISO = '%Y-%m-%dT%H:%M:%S'
 
+
 def get_id_from_detail_uri(uri):
     return int(uri.split('/')[-2])
 
@@ -27,3 +31,64 @@ def get_valid_uri(uri):
     except ValidationError:
         return None, False
     return url, True
+
+
+def iterate_in_batches(iterable, batch_size):
+    """Yields lists of at most batch_size items of the given iterable, without materializing the iterable"""
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class LRUCache(object):
+    """
+    Thread-safe mapping with a maximum size. If the size is exceeded, the least recently used entries are removed.
+    """
+
+    def __init__(self, max_size):
+        self.__max_size = max_size
+        self.__entries = OrderedDict()
+        self.__lock = RLock()
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __contains__(self, key):
+        return key in self.__entries
+
+    def get(self, key, default=None):
+        with self.__lock:
+            if key not in self.__entries:
+                return default
+            self.__entries.move_to_end(key)
+            return self.__entries[key]
+
+    def set(self, key, value):
+        with self.__lock:
+            self.__entries[key] = value
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.__max_size:
+                self.__entries.popitem(last=False)
+
+    def get_or_create(self, key, factory):
+        """Returns the entry for key. If there is none, it is created by calling factory exactly once."""
+        with self.__lock:
+            if key in self.__entries:
+                self.__entries.move_to_end(key)
+                return self.__entries[key]
+            value = factory()
+            self.set(key, value)
+            return value
+
+    def pop(self, key, default=None):
+        with self.__lock:
+            return self.__entries.pop(key, default)
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
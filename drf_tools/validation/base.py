@@ -18,6 +18,12 @@ class Validation(metaclass=ABCMeta):
     The registered key is the app name plus the snake_case version of the class name.
     NameTooLong in secretobject will be available as secretobject_name_too_long
     """
+    # seconds to cache the results of validation requests with equal data, None disables the cache
+    cacheTimeout = None
+    # models (or 'app_label.ModelName') whose changes discard the cached results
+    cacheInvalidatingModels = ()
+    # attribute of linked model instances that is part of the cache key in addition to the pk, e.g. a version field
+    cacheVersionAttr = None
 
     def __init__(self, fieldName=None):
         self.__fieldName = fieldName
@@ -0,0 +1,102 @@
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from hashlib import sha1
+import json
+from threading import Lock
+from uuid import UUID
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Model
+from django.db.models.signals import post_save, post_delete
+
+
+class ValidationResultCache:
+    """
+    Caches the response data of validations that set cacheTimeout. The cache key is built from the validation key and
+    the normalized request data, model instances are represented by their pk (and cacheVersionAttr if set). Data with
+    values, that can't be serialized stably, isn't cached.
+    Saving or deleting an instance of one of the cacheInvalidatingModels discards all results of the validation. The
+    receivers are connected by the validation registry, when it loads a validation or when the app is ready.
+    """
+    __KEY_PREFIX = 'drf_tools.validation'
+
+    def __init__(self, cacheAlias=None):
+        self.__cacheAlias = cacheAlias
+        self.__invalidatingModelKeys = {}
+        self.__lock = Lock()
+
+    def getCacheKey(self, key, ValidationClass, data):
+        """Returns the cache key for the data or None, if the validation or the data isn't cached"""
+        if not ValidationClass.cacheTimeout:
+            return None
+        try:
+            normalizedData = json.dumps(self.__normalize(data, ValidationClass.cacheVersionAttr), sort_keys=True,
+                                        default=self.__toJsonValue)
+        except TypeError:
+            return None
+        dataHash = sha1(normalizedData.encode('utf-8')).hexdigest()
+        return '{}:{}:{}:{}'.format(self.__KEY_PREFIX, key, self.__getCache().get(self.__getGenerationKey(key), 0),
+                                    dataHash)
+
+    def get(self, cacheKey):
+        return self.__getCache().get(cacheKey)
+
+    def set(self, cacheKey, ValidationClass, responseData):
+        self.__getCache().set(cacheKey, responseData, ValidationClass.cacheTimeout)
+
+    def invalidate(self, key):
+        """Discards all cached results of the validation with the given key"""
+        cache = self.__getCache()
+        generationKey = self.__getGenerationKey(key)
+        cache.add(generationKey, 0, None)
+        try:
+            cache.incr(generationKey)
+        except ValueError:  # expired in between
+            cache.set(generationKey, 1, None)
+
+    def connectInvalidatingModels(self, key, models):
+        """Discards the results of the validation key whenever an instance of the models is saved or deleted"""
+        with self.__lock:
+            for model in models:
+                label = model.lower() if isinstance(model, str) else model._meta.label_lower
+                keys = self.__invalidatingModelKeys.get(label)
+                if keys is None:
+                    keys = self.__invalidatingModelKeys[label] = set()
+                    # model labels are resolved lazily by the signals
+                    post_save.connect(self.__onModelChanged, sender=model, weak=False)
+                    post_delete.connect(self.__onModelChanged, sender=model, weak=False)
+                keys.add(key)
+
+    def __getCache(self):
+        return caches[self.__cacheAlias or getattr(settings, 'VALIDATION_CACHE_ALIAS', 'default')]
+
+    def __getGenerationKey(self, key):
+        return '{}:{}:generation'.format(self.__KEY_PREFIX, key)
+
+    def __onModelChanged(self, sender, **kwargs):
+        for key in self.__invalidatingModelKeys.get(sender._meta.label_lower, ()):
+            self.invalidate(key)
+
+    @classmethod
+    def __normalize(cls, value, versionAttr):
+        if isinstance(value, Model):
+            version = getattr(value, versionAttr, None) if versionAttr else None
+            return 'model', value._meta.label_lower, value.pk, version
+        if isinstance(value, dict):
+            return 'dict', sorted([str(k), cls.__normalize(v, versionAttr)] for k, v in value.items())
+        if isinstance(value, (list, tuple)):
+            return 'list', [cls.__normalize(v, versionAttr) for v in value]
+        return value
+
+    @staticmethod
+    def __toJsonValue(value):
+        if isinstance(value, (Decimal, date, datetime, time, UUID)):
+            return [type(value).__name__, str(value)]
+        if isinstance(value, Enum):
+            return [type(value).__name__, value.value]
+        raise TypeError('{} has no stable representation'.format(type(value).__name__))
+
+
+validationResultCache = ValidationResultCache()
@@ -1,12 +1,17 @@
 from abc import ABCMeta
+import json
+import os
+from threading import RLock
 
 from django.apps import apps
+from django.conf import settings
 from importlib import import_module
 from django.utils.module_loading import module_has_submodule
 from django.utils.text import camel_case_to_spaces
 
 from django_tooling.exceptions import ValidationError
 from drf_tools.validation.base import Validation
+from drf_tools.validation.cache import validationResultCache
 
 
 class ValidationNotFoundException(ValidationError):
@@ -16,33 +21,119 @@ class ValidationNotFoundException(ValidationError):
 
 
 class ValidationRegistry:
+    """
+    Registry of the validations in the 'validations' module of apps in INSTALLED_APPS.
+    The modules are loaded on demand: get() only imports the apps whose name is a prefix of the key. If the setting
+    VALIDATION_MANIFEST points to a manifest created by the command createvalidationmanifest, only the module of the
+    requested validation is imported.
+    The cache invalidation of validations with cacheInvalidatingModels is connected when a validation is loaded. With a
+    manifest it is connected for all validations, without importing them, by connectCacheInvalidation when drf_tools
+    is ready, so processes, that never run a cached validation, invalidate it as well.
+    """
     __VALIDATIONS_MODULE_NAME = 'validations'
 
-    def __init__(self):
+    def __init__(self, manifestPath=None):
+        self.__manifestPath = manifestPath
+        self.__manifest = None
         self.__validations = {}
-        self.__populate()
+        self.__loadedAppNames = set()
+        self.__lock = RLock()
 
     def get(self, key):
+        if key not in self.__validations:
+            with self.__lock:
+                if key not in self.__validations:
+                    self.__loadFromManifest(key) or self.__loadApps(key)
         if key not in self.__validations:
             raise ValidationNotFoundException(key)
         return self.__validations[key]
 
-    def __populate(self):
-        """Loads all subclasses of Validation in the 'validations' module of apps in INSTALLED_APPs"""
+    def getAll(self):
+        """Returns all validations by key, loading all apps"""
+        with self.__lock:
+            self.__loadApps()
+            return dict(self.__validations)
+
+    def createManifest(self):
+        """
+        Returns the manifest of all validations as {key: {'class': 'module.ClassName', 'cacheInvalidatingModels':
+        ['app_label.ModelName']}}
+        """
+        manifest = {}
+        for app in apps.get_app_configs():
+            for moduleName, attrName, cls in self.__getValidationClasses(app):
+                manifest[self.__getValidationKeyFromClass(app, cls)] = {
+                    'class': '{}.{}'.format(moduleName, attrName),
+                    'cacheInvalidatingModels': [model if isinstance(model, str) else model._meta.label
+                                                for model in cls.cacheInvalidatingModels],
+                }
+        return manifest
+
+    def connectCacheInvalidation(self):
+        """
+        Connects the cache invalidation of all validations in the manifest, without importing them. Without a manifest
+        it is only connected for the loaded validations.
+        """
+        with self.__lock:
+            for key, entry in self.__getManifest().items():
+                if isinstance(entry, dict):
+                    validationResultCache.connectInvalidatingModels(key, entry['cacheInvalidatingModels'])
+
+    def __loadFromManifest(self, key):
+        entry = self.__getManifest().get(key)
+        if entry is None:
+            return False
+        # manifests of older versions only contain the class
+        className = entry['class'] if isinstance(entry, dict) else entry
+        moduleName, attrName = className.rsplit('.', 1)
+        cls = getattr(import_module(moduleName), attrName, None)
+        if cls is None:
+            return False  # the manifest is outdated
+        self.__addValidation(key, cls)
+        return True
+
+    def __getManifest(self):
+        if self.__manifest is None:
+            self.__manifest = self.__readManifest()
+        return self.__manifest
+
+    def __readManifest(self):
+        manifestPath = self.__manifestPath or getattr(settings, 'VALIDATION_MANIFEST', None)
+        if not manifestPath or not os.path.exists(manifestPath):
+            return {}
+        with open(manifestPath) as manifestFile:
+            return json.load(manifestFile)
+
+    def __loadApps(self, key=None):
+        """Loads the validations of all apps or, if a key is given, of the apps whose name is a prefix of the key"""
         for app in apps.get_app_configs():
-            if module_has_submodule(app.module, self.__VALIDATIONS_MODULE_NAME):
-                moduleName = '%s.%s' % (app.name, self.__VALIDATIONS_MODULE_NAME)
-                module = import_module(moduleName)
-                moduleAttrs = (attr for attr in dir(module) if attr[0] != '_')
-                for attrName in moduleAttrs:
-                    cls = getattr(module, attrName)
-                    # check if the attr is a class and of type validation
-                    if not type(cls) in (type, ABCMeta) or not issubclass(cls, Validation) or cls is Validation:
-                        continue
-                    validationKey = self.__getValidationKeyFromClass(app, cls)
-                    if validationKey in self.__validations:
-                        raise Exception('Validation with name "{}" already exists.'.format(validationKey))
-                    self.__validations[validationKey] = cls
+            if app.name in self.__loadedAppNames or (key is not None and not key.startswith(app.name + '_')):
+                continue
+            for moduleName, attrName, cls in self.__getValidationClasses(app):
+                validationKey = self.__getValidationKeyFromClass(app, cls)
+                if self.__validations.get(validationKey, cls) is not cls:
+                    raise Exception('Validation with name "{}" already exists.'.format(validationKey))
+                self.__addValidation(validationKey, cls)
+            self.__loadedAppNames.add(app.name)
+
+    def __addValidation(self, key, cls):
+        self.__validations[key] = cls
+        validationResultCache.connectInvalidatingModels(key, cls.cacheInvalidatingModels)
+
+    @classmethod
+    def __getValidationClasses(cls, app):
+        """Yields module name, attribute name and class of all subclasses of Validation in the 'validations' module"""
+        if not module_has_submodule(app.module, cls.__VALIDATIONS_MODULE_NAME):
+            return
+        moduleName = '%s.%s' % (app.name, cls.__VALIDATIONS_MODULE_NAME)
+        module = import_module(moduleName)
+        moduleAttrs = (attr for attr in dir(module) if attr[0] != '_')
+        for attrName in moduleAttrs:
+            attr = getattr(module, attrName)
+            # check if the attr is a class and of type validation
+            if not type(attr) in (type, ABCMeta) or not issubclass(attr, Validation) or attr is Validation:
+                continue
+            yield moduleName, attrName, attr
 
     @staticmethod
     def __getValidationKeyFromClass(app, cls):
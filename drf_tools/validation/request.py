@@ -1,25 +1,38 @@
 from abc import ABCMeta
-from urllib.parse import urlsplit
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 from django.conf import settings
-from django.urls import set_urlconf, get_resolver
-
-import drf_nested_routing
+from django.db import connections
 from django.db.models.base import Model
 from django_tooling.moduleloading import load_module
 from rest_framework.exceptions import ParseError
 
+from drf_tools.resolvers import resolve_url, resolve_many
+from drf_tools.validation.cache import validationResultCache
 from drf_tools.validation.registry import validationRegistry
 
 
 class ValidationRequest(metaclass=ABCMeta):
-    def __init__(self, requestData):
-        data = self.__getData(requestData)
+    def __init__(self, requestData, objectsByUrl=None):
+        if not isinstance(requestData, dict):
+            raise ParseError('Expected an object but found {}.'.format(type(requestData).__name__))
+        data = self.__getData(requestData, objectsByUrl)
         key = self.__getKey(requestData)
         ValidationClass = validationRegistry.get(key)
+        self.__cacheKey = validationResultCache.getCacheKey(key, ValidationClass, data)
         self.__validation = ValidationClass(data=data)
 
     def validateAndGetResponseData(self):
+        if self.__cacheKey is None:
+            return self.__validateAndGetResponseData()
+        responseData = validationResultCache.get(self.__cacheKey)
+        if responseData is None:
+            responseData = self.__validateAndGetResponseData()
+            validationResultCache.set(self.__cacheKey, type(self.__validation), responseData)
+        return responseData
+
+    def __validateAndGetResponseData(self):
         self.__validation.validate(raiseError=False)
         valid = len(self.__validation.getFailedValidations()) == 0
         responseData = {'valid': valid}
@@ -30,43 +43,70 @@ class ValidationRequest(metaclass=ABCMeta):
             responseData['failedValidations'] = failedValidationsNative
         return responseData
 
+    @classmethod
+    def createMany(cls, requestDataList):
+        """Creates the requests of a batch. The linked objects of all requests are fetched together."""
+        urls = list()
+        for requestData in requestDataList:
+            if isinstance(requestData, dict) and '_links' in requestData:
+                urls += [cls.__getUrl(url) for url in requestData['_links'].values()]
+        objectsByUrl = cls.__getObjectsByUrl(urls)
+        return [cls(requestData, objectsByUrl) for requestData in requestDataList]
+
+    @staticmethod
+    def validateManyAndGetResponseData(validationRequests, maxWorkers=None):
+        """Returns the response data in the order of the requests. With maxWorkers the validations run in a thread pool."""
+        if not maxWorkers or len(validationRequests) < 2:
+            return [validationRequest.validateAndGetResponseData() for validationRequest in validationRequests]
+        with ThreadPoolExecutor(max_workers=maxWorkers) as executor:
+            return list(executor.map(ValidationRequest.__validateInThread, validationRequests))
+
+    @staticmethod
+    def __validateInThread(validationRequest):
+        try:
+            return validationRequest.validateAndGetResponseData()
+        finally:
+            # worker threads don't take part in the request cycle, so their connections have to be closed here
+            connections.close_all()
+
     @staticmethod
     def __getKey(requestData):
         if '_key' not in requestData:
             raise ParseError('Missing required field "_key".')
         return requestData.pop('_key')
 
-    def __getData(self, requestData):
+    def __getData(self, requestData, objectsByUrl):
         if '_links' in requestData:
-            urlconf = settings.ROOT_URLCONF
-            set_urlconf(urlconf)
-            resolver = get_resolver(urlconf)
-            for prop, url in requestData['_links'].items():
-                requestData[prop] = self.__getObjectForUrl(url, resolver)
+            urlsByProp = {prop: self.__getUrl(url) for prop, url in requestData['_links'].items()}
+            if objectsByUrl is None:
+                objectsByUrl = self.__getObjectsByUrl(urlsByProp.values())
+            for prop, url in urlsByProp.items():
+                requestData[prop] = self.__getObjectForUrl(url, objectsByUrl[url])
             del requestData['_links']
         return requestData
 
     @staticmethod
-    def __getObjectForUrl(url, resolver):
+    def __getObjectsByUrl(urls):
+        objectsByUrl = {}
+        for objects in resolve_many(OrderedDict.fromkeys(urls)).values():
+            objectsByUrl.update(objects)
+        return objectsByUrl
+
+    @staticmethod
+    def __getUrl(url):
         if isinstance(url, dict):
             if '_links' in url and 'self' in url['_links']:
-                url = url['_links']['self']
-            else:
-                raise ParseError('Expected a URL but found an object in _links')
-        pathInfo = urlsplit(url).path
-        resolver_match = resolver.resolve(pathInfo)
-        callback, callback_args, callback_kwargs = resolver_match
-        ModelCls = callback.cls.queryset.model
-        lookups = {}
-        for k, v in callback_kwargs.items():
-            if k.startswith(drf_nested_routing.PARENT_LOOKUP_NAME_PREFIX):
-                k = k[len(drf_nested_routing.PARENT_LOOKUP_NAME_PREFIX):]
-            lookups[k] = v
+                return url['_links']['self']
+            raise ParseError('Expected a URL but found an object in _links')
+        return url
 
+    @staticmethod
+    def __getObjectForUrl(url, obj):
+        ModelCls = resolve_url(url).model
         if issubclass(ModelCls, Model):
-            return ModelCls.objects.filter(**lookups).first()
+            return obj
 
         if hasattr(settings, 'VALIDATION_OBJECT_RETRIEVAL_FUNCTION'):
-            return load_module(settings.VALIDATION_OBJECT_RETRIEVAL_FUNCTION)(ModelCls, lookups)
+            return load_module(settings.VALIDATION_OBJECT_RETRIEVAL_FUNCTION)(ModelCls, dict(resolve_url(url).lookups))
 
         return None
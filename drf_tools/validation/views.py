@@ -1,3 +1,4 @@
+from rest_framework.exceptions import ParseError
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -6,9 +7,21 @@ from drf_tools.validation.request import ValidationRequest
 
 
 class ValidationView(APIView):
+    """
+    Validates one request object or a list of request objects. For a list, the response is the list of results in
+    the same order.
+    """
     permission_classes = (IsAuthenticated,)
+    max_batch_size = 100
+    # the validations of a batch run in a thread pool of this size, useful for I/O bound validations
+    max_workers = None
 
     def post(self, request, *args, **kwargs):
         data = request.data
+        if isinstance(data, list):
+            if len(data) > self.max_batch_size:
+                raise ParseError('At most {} validations are allowed per request.'.format(self.max_batch_size))
+            requests = ValidationRequest.createMany(data)
+            return Response(ValidationRequest.validateManyAndGetResponseData(requests, self.max_workers), 200)
         request = ValidationRequest(data)
         return Response(request.validateAndGetResponseData(), 200)
@@ -1,94 +1,258 @@
+from collections import OrderedDict
 from datetime import datetime
 import logging
-
+import random
+import re
+import time
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db import connections, router, transaction
+from django.db.models import ManyToManyField, Model, UniqueConstraint
+from django.db.models.fields.related_descriptors import ForwardManyToOneDescriptor, ManyToManyDescriptor, \
+    ReverseManyToOneDescriptor, ReverseOneToOneDescriptor
+from django.db.models.signals import m2m_changed, post_save, pre_save
+from django.utils.encoding import escape_uri_path
 from rest_framework import status
-from rest_framework.mixins import RetrieveModelMixin, ListModelMixin, DestroyModelMixin
+from rest_framework.mixins import RetrieveModelMixin, ListModelMixin, DestroyModelMixin, \
+    CreateModelMixin as BaseCreateModelMixin, UpdateModelMixin as BaseUpdateModelMixin
 from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import SAFE_METHODS
 from rest_framework.relations import PrimaryKeyRelatedField
 from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Empty
 from rest_framework.response import Response
+from rest_framework.serializers import ALL_FIELDS, BaseSerializer, ListSerializer, ModelSerializer, \
+    raise_errors_on_nested_writes
 from rest_framework.settings import api_settings
+from rest_framework.utils import model_meta
 from rest_framework.views import APIView
 from rest_framework.viewsets import GenericViewSet
-from rest_framework.exceptions import ParseError
+from rest_framework.exceptions import NotFound, ParseError, ValidationError
 import drf_hal_json
 from drf_hal_json.views import HalCreateModelMixin
 from drf_nested_fields.views import CustomFieldsMixin, copy_meta_attributes
 
+import drf_nested_routing
 from drf_nested_routing.views import CreateNestedModelMixin, UpdateNestedModelMixin
 
-from drf_tools import utils
+from drf_tools import utils, timing
+from drf_tools.metadata import BulkUpdateMetadata
 from drf_tools.serializers import HalNestedFieldsModelSerializer, CsvSerializer, XlsxSerializer
 
 logger = logging.getLogger(__name__)
 
+_ROUTE_GROUP_PATTERN = re.compile(r'\(\?P<(\w+)>\[\^/\.\]\+\)')
+_REGEX_SPECIAL_CHARS_PATTERN = re.compile(r'[\\.()\[\]?*+|^$]')
+_parent_url_templates = {}
+
 
 def _add_parent_to_hal_request_data(request, parentKey):
     if not drf_hal_json.is_hal_content_type(request.content_type):
         return
-    links = request.data.get('_links')
-    if links and parentKey in links:
-        return
-
-    if not links:
-        links = {}
-        request.data['_links'] = links
+    parentUrl = None
+    for data in (request.data if isinstance(request.data, list) else [request.data]):
+        if not isinstance(data, dict):
+            continue  # rejected by the serializer
+        links = data.get('_links')
+        if links and parentKey in links:
+            continue
+
+        if not links:
+            links = {}
+            data['_links'] = links
+
+        if parentUrl is None:
+            parentUrl = _get_parent_url(request, parentKey)
+        links[parentKey] = parentUrl
+
+
+def _get_parent_url(request, parentKey):
+    httpRequest = request._request
+    route = getattr(httpRequest.resolver_match, 'route', None)  # available since django 2.2
+    parentUrlTemplate = _get_parent_url_template(route, parentKey) if route else None
+    if parentUrlTemplate is not None:
+        template, fieldNames = parentUrlTemplate
+        kwargs = httpRequest.resolver_match.kwargs
+        path = template.format(**{name: _escape_path_segment(kwargs[name]) for name in fieldNames})
+        scriptName = httpRequest.path[:len(httpRequest.path) - len(httpRequest.path_info)]
+        return httpRequest.build_absolute_uri(scriptName + '/' + path)
 
     uriSplit = request.build_absolute_uri().split('/')
-    if request.method == 'PUT':
+    if request.method == 'PUT' and not isinstance(request.data, list):
         uriSplit = uriSplit[:-3]  # in case of PUT the id must be removed as well
     else:
         uriSplit = uriSplit[:-2]
+    return '/'.join(uriSplit) + '/'
 
-    links[parentKey] = '/'.join(uriSplit) + '/'
 
+def _escape_path_segment(value):
+    return value if value.isascii() and value.isalnum() else escape_uri_path(value)
 
-class RestLoggingMixin(object):
-    """Provides full logging of requests and responses"""
 
-    def finalize_response(self, request, response, *args, **kwargs):
-        if logger.isEnabledFor(logging.DEBUG):
-            logger.debug("{} {}".format(response.status_code, response.data))
-        return super(RestLoggingMixin, self).finalize_response(request, response, *args, **kwargs)
+def _get_parent_url_template(route, parentKey):
+    """
+    Returns the format string and its field names for the url of the direct parent of a nested route, e.g.
+    'resources/{parent_lookup_resource}/' for '^resources/(?P<parent_lookup_resource>[^/.]+)/related/$', or None if
+    the route can't be converted
+    """
+    key = (route, parentKey)
+    if key not in _parent_url_templates:
+        _parent_url_templates[key] = _compile_parent_url_template(route, parentKey)
+    return _parent_url_templates[key]
+
+
+def _compile_parent_url_template(route, parentKey):
+    parentGroup = '(?P<{}{}>[^/.]+)/'.format(drf_nested_routing.PARENT_LOOKUP_NAME_PREFIX, parentKey)
+    end = route.find(parentGroup)
+    if end < 0:
+        return None
+    parentRoute = route[:end + len(parentGroup)].lstrip('^')
+    if '{' in parentRoute or '}' in parentRoute:
+        return None
+    template = _ROUTE_GROUP_PATTERN.sub(r'{\1}', parentRoute)
+    if _REGEX_SPECIAL_CHARS_PATTERN.search(template):
+        return None  # only routes of plain path segments and parent lookups are supported
+    return template, tuple(_ROUTE_GROUP_PATTERN.findall(parentRoute))
+
+
+class RestLoggingMixin(object):
+    """
+    Logs method, path, status, duration and sizes of every request at level DEBUG, structured as extra 'rest' of the
+    log record. The request and response data are logged for the share logging_body_sample_rate of the requests,
+    truncated to logging_body_max_length characters. The request data is only logged if the view parsed it.
+    All messages are formatted lazily by the logging handlers, e.g. off the request thread with a
+    DeferredFormattingQueueHandler.
+    """
+    logging_body_max_length = 1000
+    logging_body_sample_rate = 1.0
+    __logging_start_time = None
 
     def initial(self, request, *args, **kwargs):
         if logger.isEnabledFor(logging.DEBUG):
-            logger.debug("{} {} {} {}".format(request.method, request.path, request.query_params, request.data))
+            self.__logging_start_time = time.monotonic()
         super(RestLoggingMixin, self).initial(request, *args, **kwargs)
 
-
-class DefaultSerializerMixin(object):
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super(RestLoggingMixin, self).finalize_response(request, response, *args, **kwargs)
+        if logger.isEnabledFor(logging.DEBUG):
+            if hasattr(response, 'add_post_render_callback') and not response.is_rendered:
+                # the size is known after rendering, which happens after the view returned
+                response.add_post_render_callback(lambda rendered_response: self.__log(request, rendered_response))
+            else:
+                self.__log(request, response)
+        return response
+
+    def __log(self, request, response):
+        start_time = self.__logging_start_time
+        fields = OrderedDict()
+        fields['method'] = request.method
+        fields['path'] = request.get_full_path()
+        fields['status_code'] = response.status_code
+        fields['duration_ms'] = None if start_time is None else round((time.monotonic() - start_time) * 1000, 1)
+        fields['request_size'] = int(request.META.get('CONTENT_LENGTH') or 0)
+        fields['response_size'] = None if response.streaming else len(response.content)
+        logger.debug("%s %s %s %sms request %s bytes response %s bytes", *fields.values(), extra={'rest': fields})
+
+        if self.logging_body_max_length and random.random() < self.logging_body_sample_rate:
+            # request._full_data is only set if the view parsed the request data
+            request_data = getattr(request, '_full_data', Empty)
+            request_data = None if request_data is Empty else request_data
+            logger.debug("%s %s request data: %s response data: %s", fields['method'], fields['path'],
+                         _TruncatedData(request_data, self.logging_body_max_length),
+                         _TruncatedData(getattr(response, 'data', None), self.logging_body_max_length),
+                         extra={'rest': fields})
+
+
+class _TruncatedData(object):
+    """Log argument, that formats the data only when the record is formatted"""
+
+    def __init__(self, data, max_length):
+        self.data = data
+        self.max_length = max_length
+
+    def __str__(self):
+        text = str(self.data)
+        if len(text) > self.max_length:
+            return '{}... ({} characters)'.format(text[:self.max_length], len(text))
+        return text
+
+
+class RequestTimingMixin(object):
     """
-    If a view has no serializer_class specified, this mixin takes care of creating a default serializer_class that inherits
-    HalNestedFieldsModelSerializer
+    Measures duration and query count of the phases permissions, filter, serializer and render, including blocks timed
+    with drf_tools.timing.timed() during the request (e.g. the link checks of BusinessPermission). The timings are
+    sent to the metrics_sink (e.g. a StatsdMetricsSink) and with the signal request_timed. With server_timing_header
+    they are also returned in the Server-Timing header, which reveals internals to clients, so it should only be
+    enabled for development or internal APIs.
     """
+    server_timing_header = False
+    metrics_sink = None
 
-    def get_serializer_class(self):
-        if not self.serializer_class:
-            class DefaultSerializer(HalNestedFieldsModelSerializer):
-                class Meta:
-                    model = self.queryset.model
-                    fields = '__all__'
+    def dispatch(self, request, *args, **kwargs):
+        timings = timing.start_request_timing()
+        try:
+            response = super(RequestTimingMixin, self).dispatch(request, *args, **kwargs)
+        except BaseException:
+            timing.stop_request_timing(timings)
+            raise
+        if hasattr(response, 'add_post_render_callback') and not response.is_rendered:
+            render_phase = timings.start_phase('render')
+            response.add_post_render_callback(
+                lambda rendered_response: self.__finish_timing(request, rendered_response, timings, render_phase))
+        else:
+            self.__finish_timing(request, response, timings)
+        return response
 
-            self.serializer_class = DefaultSerializer
+    def check_permissions(self, request):
+        with timing.timed('permissions'):
+            super(RequestTimingMixin, self).check_permissions(request)
 
-        return self.serializer_class
+    def check_object_permissions(self, request, obj):
+        with timing.timed('permissions'):
+            super(RequestTimingMixin, self).check_object_permissions(request, obj)
 
+    def filter_queryset(self, queryset):
+        with timing.timed('filter'):
+            return super(RequestTimingMixin, self).filter_queryset(queryset)
 
-class HalNoLinksMixin(ListModelMixin):
-    """
-    For responses with a high amount of data, link generation can be switched of via query-param 'no_links'. Instead of links,
-    simple ids are returned
-    """
+    def get_serializer(self, *args, **kwargs):
+        with timing.timed('serializer'):
+            return super(RequestTimingMixin, self).get_serializer(*args, **kwargs)
 
-    def get_serializer_class(self):
-        no_links = extract_boolean_from_query_params(self.get_serializer_context().get('request'), "no_links")
-        if not no_links:
-            return super(HalNoLinksMixin, self).get_serializer_class()
+    def __finish_timing(self, request, response, timings, render_phase=None):
+        if render_phase is not None:
+            render_phase.stop()
+        timing.stop_request_timing(timings)
+        phases = timings.get_phases()
+        if self.server_timing_header:
+            response['Server-Timing'] = timing.get_server_timing_header(phases)
+        if self.metrics_sink is not None:
+            self.metrics_sink.send('{}.{}'.format(self.__class__.__name__, getattr(self, 'action', None) or
+                                                  request.method.lower()), phases)
+        timing.request_timed.send(sender=self.__class__, request=request, response=response, timings=phases)
 
-        self.always_included_fields = ["id"]
-        serializer_class = super(HalNoLinksMixin, self).get_serializer_class()
 
+SERIALIZER_CLASS_CACHE_SIZE = 1000
+
+# generated serializer classes by (base serializer class, mode), shared by all views of the process
+_serializer_classes = utils.LRUCache(SERIALIZER_CLASS_CACHE_SIZE)
+
+
+def get_default_serializer_class(model_cls):
+    def create_default_serializer_class():
+        class DefaultSerializer(HalNestedFieldsModelSerializer):
+            class Meta:
+                model = model_cls
+                fields = '__all__'
+
+        return DefaultSerializer
+
+    return _serializer_classes.get_or_create((HalNestedFieldsModelSerializer, ('default', model_cls)),
+                                             create_default_serializer_class)
+
+
+def get_no_links_serializer_class(serializer_class):
+    def create_no_links_serializer_class():
         class HalNoLinksSerializer(serializer_class):
             serializer_related_field = PrimaryKeyRelatedField
 
@@ -107,6 +271,50 @@ class HalNoLinksMixin(ListModelMixin):
 
         return HalNoLinksSerializer
 
+    return _serializer_classes.get_or_create((serializer_class, 'no_links'), create_no_links_serializer_class)
+
+
+def warm_up_serializer_classes(viewsets):
+    """
+    Creates the default and no_links serializer classes of the given viewset classes, e.g. at startup for the viewsets
+    of a router, so that they are not created by the first requests
+    """
+    for viewset in viewsets:
+        serializer_class = viewset.serializer_class
+        if not serializer_class and issubclass(viewset, DefaultSerializerMixin) and viewset.queryset is not None:
+            serializer_class = get_default_serializer_class(viewset.queryset.model)
+        if serializer_class and issubclass(viewset, HalNoLinksMixin):
+            get_no_links_serializer_class(serializer_class)
+
+
+class DefaultSerializerMixin(object):
+    """
+    If a view has no serializer_class specified, this mixin takes care of creating a default serializer_class that inherits
+    HalNestedFieldsModelSerializer
+    """
+
+    def get_serializer_class(self):
+        if not self.serializer_class:
+            self.serializer_class = get_default_serializer_class(self.queryset.model)
+
+        return self.serializer_class
+
+
+class HalNoLinksMixin(ListModelMixin):
+    """
+    For responses with a high amount of data, link generation can be switched of via query-param 'no_links'. Instead of links,
+    simple ids are returned
+    """
+
+    def get_serializer_class(self):
+        no_links = extract_boolean_from_query_params(self.get_serializer_context().get('request'), "no_links")
+        if not no_links:
+            return super(HalNoLinksMixin, self).get_serializer_class()
+
+        self.always_included_fields = ["id"]
+        serializer_class = super(HalNoLinksMixin, self).get_serializer_class()
+        return get_no_links_serializer_class(serializer_class)
+
 
 class CreateModelMixin(CreateNestedModelMixin, HalCreateModelMixin):
     """
@@ -119,7 +327,135 @@ class CreateModelMixin(CreateNestedModelMixin, HalCreateModelMixin):
 
 
 class ReadModelMixin(HalNoLinksMixin, CustomFieldsMixin, RetrieveModelMixin, ListModelMixin):
+    """
+    For reading requests the queryset is optimized for the resolved serializer: related objects needed for the links
+    are fetched with `select_related` and `prefetch_related` and only the needed columns are loaded if possible.
+    This can be switched off with `optimize_queryset = False`.
+    """
     always_included_fields = ["id", api_settings.URL_FIELD_NAME]
+    optimize_queryset = True
+
+    def get_queryset(self):
+        queryset = super(ReadModelMixin, self).get_queryset()
+        if not self.optimize_queryset or self.request is None or self.request.method not in SAFE_METHODS:
+            return queryset
+        return self._optimize_queryset(queryset, self.get_serializer_class())
+
+    def _optimize_queryset(self, queryset, serializer_class):
+        model = queryset.model
+        field_names = self._get_serializer_field_names(serializer_class, model)
+        nested_fields = getattr(serializer_class.Meta, 'nested_fields', None) or {}
+        with_links = not issubclass(serializer_class.serializer_related_field, PrimaryKeyRelatedField)
+        select_related = []
+        prefetch_related = []
+
+        if with_links and api_settings.URL_FIELD_NAME in field_names:
+            # the self link of a nested resource is built from its parent objects
+            select_related += self._get_parent_lookup_relations(model, True)
+
+        for field_name in field_names:
+            if field_name in nested_fields:
+                continue  # embedded fields are expanded by CustomFieldsMixin
+            field = getattr(model, field_name, None)
+            if isinstance(field, ForwardManyToOneDescriptor):
+                # links to resources without parent lookups are built from the foreign key only
+                related_model = field.field.related_model
+                if with_links and drf_nested_routing.get_parent_query_lookups_by_class(related_model):
+                    select_related.append(field_name)
+                    select_related += [field_name + '__' + relation for relation in
+                                       self._get_parent_lookup_relations(related_model, False)]
+            elif isinstance(field, ReverseOneToOneDescriptor):
+                select_related.append(field_name)
+            elif isinstance(field, ReverseManyToOneDescriptor):
+                prefetch_related.append(field_name)
+                if with_links:
+                    related_model = self._get_many_related_model(field)
+                    prefetch_related += [field_name + '__' + relation for relation in
+                                         self._get_parent_lookup_relations(related_model, False)]
+
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        only_fields = self._get_only_fields(serializer_class, model, field_names, select_related)
+        if only_fields:
+            queryset = queryset.only(*only_fields)
+        return queryset
+
+    @staticmethod
+    def _get_serializer_field_names(serializer_class, model):
+        fields = getattr(serializer_class.Meta, 'fields', None)
+        if fields is None or fields == ALL_FIELDS:
+            fields = [api_settings.URL_FIELD_NAME] + [field.name for field in model._meta.concrete_fields] + \
+                     [field.name for field in model._meta.many_to_many]
+        exclude = getattr(serializer_class.Meta, 'exclude', None) or ()
+        return [field_name for field_name in fields if field_name not in exclude]
+
+    @staticmethod
+    def _get_parent_lookup_relations(model, with_last_part):
+        """
+        The relations that are traversed to build the parent lookups of links to a nested resource. The self link needs
+        the complete path, links from other resources only the path up to the last part, which is taken as '<part>_id'.
+        """
+        relations = []
+        for lookup in drf_nested_routing.get_parent_query_lookups_by_class(model):
+            lookup_path = lookup.split('__')
+            if not with_last_part:
+                lookup_path = lookup_path[:-1]
+            if lookup_path and ReadModelMixin._is_single_relation_path(model, lookup_path):
+                relations.append('__'.join(lookup_path))
+        return relations
+
+    @staticmethod
+    def _is_single_relation_path(model, lookup_path):
+        for part in lookup_path:
+            field = getattr(model, part, None)
+            if not isinstance(field, ForwardManyToOneDescriptor):
+                return False
+            model = field.field.related_model
+        return True
+
+    @staticmethod
+    def _get_many_related_model(field):
+        if isinstance(field, ManyToManyDescriptor):
+            return field.field.model if field.reverse else field.field.related_model
+        return field.rel.related_model
+
+    @staticmethod
+    def _get_only_fields(serializer_class, model, field_names, select_related):
+        """
+        Columns are only restricted, if all fields of the serializer are model fields or declared fields with a plain
+        model field as source. Otherwise the serializer might access attributes, that depend on deferred columns (e.g.
+        fields with a dotted source, properties or method fields).
+        """
+        if {field.name for field in model._meta.concrete_fields} <= set(field_names):
+            return None  # everything is loaded anyway
+
+        declared_fields = getattr(serializer_class, '_declared_fields', {})
+        only_fields = {model._meta.pk.name}
+        for field_name in field_names:
+            if field_name == api_settings.URL_FIELD_NAME:
+                continue
+            if field_name in declared_fields:
+                # method fields have the source '*'
+                field_name = declared_fields[field_name].source or field_name
+            try:
+                field = model._meta.get_field(field_name)
+            except FieldDoesNotExist:
+                return None
+            if field.concrete and not field.many_to_many:
+                only_fields.add(field_name)
+        only_fields.update(relation.split('__')[0] for relation in select_related)
+        return sorted(only_fields)
+
+    def _get_custom_field_serializer_class(self, base_serializer_class):
+        request = self.get_serializer_context().get('request')
+        if not request or 'fields' not in request.query_params:
+            return None
+
+        key = (base_serializer_class, ('fields', tuple(self.always_included_fields), request.query_params['fields']))
+        return _serializer_classes.get_or_create(
+            key, lambda: super(ReadModelMixin, self)._get_custom_field_serializer_class(base_serializer_class))
 
 
 class UpdateModelMixin(UpdateNestedModelMixin):
@@ -155,7 +491,297 @@ class PartialUpdateOnlyMixin(object):
         serializer.save()
 
 
-class BaseViewSet(RestLoggingMixin, DefaultSerializerMixin, GenericViewSet):
+class BulkCreateModelMixin(CreateModelMixin):
+    """
+    A POST of a list of resources creates all of them in one transaction, their permissions are checked in bulk.
+    The resources are validated in one serializer pass and saved with `bulk_create` in batches of `bulk_batch_size`.
+    If `perform_create`, the serializer's `create` or `save` or the model's `save` are overridden or save signals are
+    connected, every resource is created with its own serializer through `perform_create` instead.
+    """
+    bulk_batch_size = 1000
+    max_bulk_size = 10000
+
+    def create(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            return super(BulkCreateModelMixin, self).create(request, *args, **kwargs)
+        _check_bulk_size(request.data, self.max_bulk_size)
+        self._add_parent_to_request_data_through_lookup(request, **kwargs)
+        if not _can_save_in_bulk(self, BaseCreateModelMixin.perform_create, ModelSerializer.create):
+            return self.__create_one_by_one(request.data)
+        serializer = self.get_bulk_create_serializer(request.data)
+        serializer.is_valid(raise_exception=True)
+        _check_unique_in_bulk(serializer.child.Meta.model, [(None, data) for data in serializer.validated_data])
+        with transaction.atomic():
+            self.perform_bulk_create(serializer)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def get_bulk_create_serializer(self, data):
+        """
+        The list serializer is created explicitly, because the HAL serializer expects a dict as data, which many=True
+        would pass to the child as well
+        """
+        child = self.get_serializer()
+        list_serializer_class = getattr(getattr(child, 'Meta', None), 'list_serializer_class', ListSerializer)
+        return list_serializer_class(child=child, data=_get_bulk_resources(data), context=child.context)
+
+    def perform_bulk_create(self, serializer):
+        ModelCls = serializer.child.Meta.model
+        instances = []
+        for batch in utils.iterate_in_batches(serializer.validated_data, self.bulk_batch_size):
+            instances += _bulk_create_instances(ModelCls, serializer.child, batch)
+        serializer.instance = instances
+
+    def __create_one_by_one(self, data):
+        serializers = [self.get_serializer(data=resource_data) for resource_data in _get_bulk_resources(data)]
+        _validate_bulk(serializers)
+        with transaction.atomic():
+            for serializer in serializers:
+                self.perform_create(serializer)
+        return Response([serializer.data for serializer in serializers], status=status.HTTP_201_CREATED)
+
+
+class BulkUpdateModelMixin(UpdateModelMixin):
+    """
+    A PUT of a list of resources to the list url updates all of them in one transaction. The resources are identified
+    by their id or self link and loaded with one query. Object permissions are checked in bulk if the permission class
+    provides `has_objects_permission`. The resources are saved with `bulk_update` in batches of `bulk_batch_size`,
+    unless `perform_update`, the serializer's `update` or `save` or the model's `save` are overridden or save signals
+    are connected, then every resource is saved through `perform_update`.
+    """
+    bulk_batch_size = 1000
+    max_bulk_size = 10000
+    metadata_class = BulkUpdateMetadata
+
+    def bulk_update(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            raise ParseError('Expected a list of resources.')
+        _check_bulk_size(request.data, self.max_bulk_size)
+        self._add_parent_to_request_data_through_lookup(request, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        pks = [self._get_bulk_item_pk(queryset.model, data) for data in request.data]
+        instances_by_pk = {str(pk): instance for pk, instance in queryset.in_bulk(pks).items()}
+        missing_pks = [pk for pk in pks if str(pk) not in instances_by_pk]
+        if missing_pks:
+            raise NotFound('Resources with the ids {} do not exist.'.format(', '.join(str(pk) for pk in missing_pks)))
+        instances = [instances_by_pk[str(pk)] for pk in pks]
+        self.check_objects_permissions(request, instances)
+
+        serializers = [self.get_serializer(instance, data=data) for instance, data in zip(instances, request.data)]
+        _validate_bulk(serializers)
+        with transaction.atomic():
+            if _can_save_in_bulk(self, BaseUpdateModelMixin.perform_update, ModelSerializer.update):
+                self.perform_bulk_update(serializers)
+            else:
+                for serializer in serializers:
+                    self.perform_update(serializer)
+        return Response([serializer.data for serializer in serializers])
+
+    def perform_bulk_update(self, serializers):
+        """auto_now fields are set like by save, because bulk_update doesn't"""
+        if not serializers:
+            return
+        ModelCls = type(serializers[0].instance)
+        auto_now_fields = [field for field in ModelCls._meta.concrete_fields if getattr(field, 'auto_now', False)]
+        instances = []
+        field_names = {field.name for field in auto_now_fields}
+        many_to_many = []
+        for serializer in serializers:
+            raise_errors_on_nested_writes('update', serializer, serializer.validated_data)
+            attrs, many_to_many_attrs = _split_many_to_many_attrs(serializer.instance, serializer.validated_data)
+            for attr, value in attrs.items():
+                setattr(serializer.instance, attr, value)
+            for field in auto_now_fields:
+                field.pre_save(serializer.instance, False)
+            field_names.update(attrs)
+            instances.append(serializer.instance)
+            many_to_many.append((serializer.instance, many_to_many_attrs))
+        if field_names:
+            ModelCls.objects.bulk_update(instances, field_names, batch_size=self.bulk_batch_size)
+        _set_many_to_many_attrs(many_to_many)
+
+    def check_objects_permissions(self, request, objs):
+        with timing.timed('permissions'):
+            for permission in self.get_permissions():
+                if hasattr(permission, 'has_objects_permission'):
+                    allowed = permission.has_objects_permission(request, self, objs)
+                else:
+                    allowed = all(permission.has_object_permission(request, self, obj) for obj in objs)
+                if not allowed:
+                    self.permission_denied(request, message=getattr(permission, 'message', None))
+
+    @staticmethod
+    def _get_bulk_item_pk(model, data):
+        if not isinstance(data, dict):
+            raise ParseError('Expected a resource but found {}.'.format(type(data).__name__))
+        if data.get('id') is not None:
+            return _to_pk(model, data['id'])
+        url = data.get('_links', {}).get(api_settings.URL_FIELD_NAME)
+        if url and utils.is_detail_uri(url):
+            return _to_pk(model, utils.get_id_from_detail_uri(url))
+        raise ParseError('Every resource needs an id or a self link.')
+
+
+def _to_pk(model, value):
+    try:
+        return model._meta.pk.to_python(value)
+    except (DjangoValidationError, TypeError, ValueError):
+        raise ParseError('{!r} is not a valid id.'.format(value))
+
+
+def _check_bulk_size(data, max_bulk_size):
+    if max_bulk_size is not None and len(data) > max_bulk_size:
+        raise ParseError('At most {} resources are allowed per request.'.format(max_bulk_size))
+
+
+def _get_bulk_resources(data):
+    for resource_data in data:
+        if not isinstance(resource_data, dict):
+            raise ParseError('Expected a resource but found {}.'.format(type(resource_data).__name__))
+        resource_data.setdefault(drf_hal_json.LINKS_FIELD_NAME, dict())
+    return data
+
+
+def _validate_bulk(serializers):
+    errors = [serializer.errors if not serializer.is_valid() else {} for serializer in serializers]
+    if any(errors):
+        raise ValidationError(errors)
+    if serializers:
+        _check_unique_in_bulk(serializers[0].Meta.model,
+                              [(serializer.instance, serializer.validated_data) for serializer in serializers])
+
+
+def _can_save_in_bulk(view, base_perform_save, base_serializer_save):
+    """
+    bulk_create and bulk_update bypass the perform hook of the view, the serializer, the model's save and the save
+    signals, so they are only used if none of these is customized
+    """
+    serializer_class = view.get_serializer_class()
+    ModelCls = serializer_class.Meta.model
+    return getattr(type(view), base_perform_save.__name__) is base_perform_save and \
+        getattr(serializer_class, base_serializer_save.__name__) is base_serializer_save and \
+        serializer_class.save is BaseSerializer.save and \
+        ModelCls.save is Model.save and \
+        not pre_save.has_listeners(ModelCls) and not post_save.has_listeners(ModelCls) and \
+        not any(m2m_changed.has_listeners(field.remote_field.through) for field in ModelCls._meta.many_to_many)
+
+
+def _check_unique_in_bulk(ModelCls, resources):
+    """
+    The unique validators of the serializers only check against the database, so the resources of a bulk request are
+    additionally checked against each other. resources are tuples of (instance or None, validated data).
+    """
+    errors = [{} for _ in resources]
+    for fields in _get_unique_field_sets(ModelCls):
+        seen_values = set()
+        for resource_errors, (instance, validated_data) in zip(errors, resources):
+            values = _get_unique_values(fields, instance, validated_data)
+            if values is None:
+                continue
+            if values in seen_values:
+                if len(fields) == 1:
+                    resource_errors.setdefault(fields[0].name, []).append(
+                        'This field must be unique within the request.')
+                else:
+                    resource_errors.setdefault(api_settings.NON_FIELD_ERRORS_KEY, []).append(
+                        'The fields {} must make a unique set within the request.'.format(
+                            ', '.join(field.name for field in fields)))
+            seen_values.add(values)
+    if any(errors):
+        raise ValidationError(errors)
+
+
+def _get_unique_field_sets(ModelCls):
+    opts = ModelCls._meta
+    field_sets = [(field,) for field in opts.concrete_fields if field.unique]
+    field_names = list(opts.unique_together)
+    field_names += [constraint.fields for constraint in opts.constraints
+                    if isinstance(constraint, UniqueConstraint) and constraint.condition is None]
+    field_sets += [tuple(opts.get_field(field_name) for field_name in names) for names in field_names]
+    return field_sets
+
+
+def _get_unique_values(fields, instance, validated_data):
+    """Returns None, if a value is missing or null, because then the database doesn't compare them"""
+    values = []
+    for field in fields:
+        if field.name in validated_data:
+            value = validated_data[field.name]
+        elif instance is not None:
+            value = getattr(instance, field.attname)
+        else:
+            return None
+        if isinstance(value, Model):
+            value = value.pk
+        if value is None:
+            return None
+        values.append(value)
+    return tuple(values)
+
+
+def _split_many_to_many_attrs(model, validated_data):
+    relations = model_meta.get_field_info(model).relations
+    attrs = {}
+    many_to_many_attrs = {}
+    for attr, value in validated_data.items():
+        if attr in relations and relations[attr].to_many:
+            many_to_many_attrs[attr] = value
+        else:
+            attrs[attr] = value
+    return attrs, many_to_many_attrs
+
+
+def _set_many_to_many_attrs(many_to_many):
+    for instance, many_to_many_attrs in many_to_many:
+        for attr, value in many_to_many_attrs.items():
+            getattr(instance, attr).set(value)
+
+
+def _bulk_create_instances(ModelCls, serializer, validated_data_list):
+    """Saves the instances with bulk_create, if the database returns the primary keys, otherwise one by one"""
+    instances = []
+    many_to_many = []
+    for validated_data in validated_data_list:
+        raise_errors_on_nested_writes('create', serializer, validated_data)
+        attrs, many_to_many_attrs = _split_many_to_many_attrs(ModelCls, validated_data)
+        instance = ModelCls(**attrs)
+        instances.append(instance)
+        many_to_many.append((instance, many_to_many_attrs))
+    connection = connections[router.db_for_write(ModelCls)]
+    if getattr(connection.features, 'can_return_rows_from_bulk_insert',
+               getattr(connection.features, 'can_return_ids_from_bulk_insert', False)):
+        ModelCls.objects.bulk_create(instances)
+    else:
+        for instance in instances:
+            instance.save(force_insert=True)
+    _add_many_to_many_attrs_of_new_instances(ModelCls, many_to_many)
+    return instances
+
+
+def _add_many_to_many_attrs_of_new_instances(ModelCls, many_to_many):
+    """
+    The relations of many to many fields with an auto created through model are inserted with one bulk_create per
+    field, like bulk_create no m2m_changed signals are sent. Other relations are set one by one.
+    """
+    through_instances_by_model = {}
+    other_many_to_many = []
+    for instance, many_to_many_attrs in many_to_many:
+        other_many_to_many_attrs = {}
+        for attr, value in many_to_many_attrs.items():
+            field = ModelCls._meta.get_field(attr)
+            if not isinstance(field, ManyToManyField) or not field.remote_field.through._meta.auto_created:
+                other_many_to_many_attrs[attr] = value
+                continue
+            Through = field.remote_field.through
+            through_instances_by_model.setdefault(Through, []).extend(
+                Through(**{field.m2m_field_name(): instance, field.m2m_reverse_field_name(): related_obj})
+                for related_obj in value)
+        other_many_to_many.append((instance, other_many_to_many_attrs))
+    for Through, through_instances in through_instances_by_model.items():
+        Through.objects.bulk_create(through_instances)
+    _set_many_to_many_attrs(other_many_to_many)
+
+
+class BaseViewSet(RequestTimingMixin, RestLoggingMixin, DefaultSerializerMixin, GenericViewSet):
     pass
 
 
@@ -163,9 +789,15 @@ class ModelViewSet(CreateModelMixin, ReadModelMixin, UpdateModelMixin, DestroyMo
     pass
 
 
+class BulkModelViewSet(BulkCreateModelMixin, ReadModelMixin, BulkUpdateModelMixin, DestroyModelMixin, BaseViewSet):
+    """ModelViewSet, that additionally creates and updates lists of resources"""
+    pass
+
+
 class FileUploadView(RestLoggingMixin, APIView):
     parser_classes = (MultiPartParser,)
     renderer_classes = (JSONRenderer,)
+    import_batch_size = 1000
 
     def _get_file_and_name(self, request):
         file = self._get_file_from_request(request)
@@ -182,6 +814,18 @@ class FileUploadView(RestLoggingMixin, APIView):
             raise ValueError("Mulitpart content must contain file.")
         return in_memory_upload_file
 
+    def _import_in_batches(self, rows, import_batch):
+        """
+        Calls import_batch with lists of at most import_batch_size rows. Each batch is committed in its own transaction,
+        so rows can be consumed lazily from a generator. Returns the number of imported rows.
+        """
+        row_count = 0
+        for batch in utils.iterate_in_batches(rows, self.import_batch_size):
+            with transaction.atomic():
+                import_batch(batch)
+            row_count += len(batch)
+        return row_count
+
 
 class XlsxImportView(FileUploadView):
     default_sheet_name = None
@@ -189,9 +833,19 @@ class XlsxImportView(FileUploadView):
 
     def _get_xlsx_content_as_list_and_file_info(self, request):
         file_bytes, filename = self._get_file_bytes_and_name(request)
-        sheetName = request.query_params.get('sheetName') or self.default_sheet_name
+        sheetName = self._get_sheet_name(request)
         return XlsxSerializer.deserialize(file_bytes, sheetName), filename, file_bytes
 
+    def _get_xlsx_rows_and_filename(self, request):
+        """
+        Returns a generator over the rows of the uploaded file, which is read directly from the upload file handle
+        """
+        file, filename = self._get_file_and_name(request)
+        return XlsxSerializer.iter_rows(file, self._get_sheet_name(request)), filename
+
+    def _get_sheet_name(self, request):
+        return request.query_params.get('sheetName') or self.default_sheet_name
+
 
 class CsvImportView(FileUploadView):
     media_type = 'text/csv'
@@ -200,6 +854,13 @@ class CsvImportView(FileUploadView):
         file_bytes, filename = self._get_file_bytes_and_name(request)
         return CsvSerializer.deserialize(file_bytes), filename, file_bytes
 
+    def _get_csv_rows_and_filename(self, request):
+        """
+        Returns a csv reader over the uploaded file, which is decoded incrementally from the upload file handle
+        """
+        file, filename = self._get_file_and_name(request)
+        return CsvSerializer.iter_rows(file), filename
+
 
 def extract_int_from_query_params(request, key):
     value = request.query_params.get(key)
@@ -19,3 +19,4 @@ class RelatedResource2(models.Model):
     active = models.BooleanField(default=True)
     related_resources_1 = models.ManyToManyField(RelatedResource1)
     resource = models.ForeignKey(TestResource)
+    modified = models.DateTimeField(auto_now=True)
@@ -0,0 +1,35 @@
+from drf_tools.auth.permissionservice import BasePermissionService
+
+from .models import TestResource
+
+
+class TestPermissionService(BasePermissionService):
+    """
+    TestResource is the permission model. Objects, whose name starts with 'forbidden', can't be accessed and nothing
+    can be created for TestResources, whose name starts with 'readonly'. Everything else is allowed. The calls of
+    has_permission and has_object_permission are recorded.
+    """
+    calls = []
+
+    def is_business_admin(self, user, permission_model_id=None, **kwargs):
+        return False
+
+    def get_permission_model_attr(self, model):
+        return 'id' if model is TestResource else 'resource'
+
+    def get_permission_model_filter_param(self, model):
+        return 'resourceId'
+
+    def get_permission_model_ids_from_object(self, obj):
+        return [obj.id if isinstance(obj, TestResource) else obj.resource_id]
+
+    def get_permitted_permission_models(self, user, operation):
+        return TestResource.objects.exclude(name__startswith='forbidden')
+
+    def has_permission(self, user, permission_model_id, model, operation, **kwargs):
+        self.calls.append(('has_permission', permission_model_id, model, operation))
+        return not TestResource.objects.filter(id=permission_model_id, name__startswith='readonly').exists()
+
+    def has_object_permission(self, user, obj, operation):
+        self.calls.append(('has_object_permission', obj, operation))
+        return not obj.name.startswith('forbidden')
@@ -14,6 +14,7 @@ INSTALLED_APPS = (
     'django.contrib.staticfiles',
     'django.contrib.admindocs',
     'rest_framework',
+    'drf_tools.apps.DrfToolsConfig',
     'testproject'
 )
 
@@ -44,6 +45,10 @@ REST_FRAMEWORK = {
 
 STATIC_URL = '/static/'
 
+DRF_TOOLS = {
+    'PERMISSION_SERVICE': 'testproject.permissionservice.TestPermissionService',
+}
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -1,9 +1,54 @@
+from datetime import date
 from decimal import Decimal
+from io import BytesIO
+import json
+import logging
+import socket
+from queue import Queue
+from tempfile import NamedTemporaryFile
+from unittest.mock import patch
+import zipfile
 
+from django.contrib.auth.models import User
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections, connection
+from django.http import QueryDict
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.urls import resolve
+from django_filters import CharFilter
 import drf_hal_json
+from drf_hal_json.parsers import JsonHalParser
+from openpyxl import Workbook, load_workbook
+from rest_framework.fields import CharField, SerializerMethodField
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework.versioning import QueryParameterVersioning
+
+from drf_tools.auth.authentications import EmailAuthBackend, VerifiedCredentialCache
+from drf_tools.auth.filters import SubqueryPermissionFiltering
+from drf_tools.auth.models import Operation
+from drf_tools.auth.permissioncache import CachingPermissionService, permissions_changed
+from drf_tools.auth.permissions import BusinessPermission
+from drf_tools.fields import NestedHyperlinkedRelatedField
+from drf_tools.filters import EnumFilter, ListFilterSet
+from drf_tools.identitymap import identity_map
+from drf_tools.loghandlers import DeferredFormattingQueueHandler
+from drf_tools.pagination import HalCursorPagination
+from drf_tools.renderers import AnyFileFromSystemRenderer, CsvRenderer
+from drf_tools.resolvers import resolve_many, resolve_url
+from drf_tools.serializers import HalNestedFieldsModelSerializer, CsvSerializer, XlsxSerializer, ZipMember, ZipSerializer
+from drf_tools.timing import StatsdMetricsSink, request_timed, start_request_timing, stop_request_timing
+from drf_tools.validation.cache import ValidationResultCache
+from drf_tools.validation.registry import ValidationNotFoundException, ValidationRegistry
+from drf_tools.validation.views import ValidationView
+from drf_tools.views import FileUploadView, ReadModelMixin, get_default_serializer_class, get_no_links_serializer_class, _get_parent_url
 from drf_tools.test.base import IncludeFields, ModelViewSetTest, AdvancedReadModelViewSetTestMixin, BaseRestTest
 
 from .models import TestResource, RelatedResource1, RelatedResource2
+from .permissionservice import TestPermissionService
+from .urls import router
+from .views import RelatedResource2ViewSet, TestResourceViewSet
+from .validations import CachedResourceName, ResourceName
 
 
 class TestResourceViewSetTest(AdvancedReadModelViewSetTestMixin, ModelViewSetTest):
@@ -143,6 +188,129 @@ class RelatedResource2ViewSetTest(AdvancedReadModelViewSetTestMixin, ModelViewSe
     def _getIncludeFields(self):
         return IncludeFields(["name"], ["resource"], {"related_resources_1": IncludeFields(["name"])})
 
+    def testBulkPOST(self):
+        content, parentLookups = self._createModelAsJson()
+        contents = [dict(content, name="related-resource2_{}".format(i)) for i in range(3)]
+        resp = self._doPOST(self._getModelClass(), contents, parentLookups)
+        self.assertEqual(201, resp.status_code, resp.content)
+        self.assertEqual(3, len(resp.data))
+        for content, data in zip(contents, resp.data):
+            relatedResource = RelatedResource2.objects.get(id=data["id"])
+            self._assertModelEqual(content, relatedResource)
+            self.assertEqual(parentLookups["resource"], relatedResource.resource_id)
+            self.assertEqual(2, relatedResource.related_resources_1.count())
+
+    def testBulkPOSTValidatesAllResources(self):
+        content, parentLookups = self._createModelAsJson()
+        resp = self._doPOST(self._getModelClass(), [content, dict(content, name="")], parentLookups)
+        self.assertEqual(400, resp.status_code, resp.content)
+        self.assertEqual(0, RelatedResource2.objects.count())
+
+    def testBulkPUT(self):
+        relatedResources = [self._getOrCreateModelInstance() for i in range(3)]
+        resource = relatedResources[0].resource
+        for relatedResource in relatedResources:
+            relatedResource.resource = resource
+            relatedResource.save()
+        contents = [self._buildContent({"id": relatedResource.id, "name": "new_name_{}".format(relatedResource.id)},
+                                       {"related_resources_1": [self._getAbsoluteDetailURI(related)
+                                                                for related in relatedResource.related_resources_1.all()]})
+                    for relatedResource in relatedResources]
+        resp = self.client.put(self._getRelativeListURI(RelatedResource2, {"resource": resource.id}),
+                               json.dumps(contents), drf_hal_json.HAL_JSON_MEDIA_TYPE)
+        self.assertEqual(200, resp.status_code, resp.content)
+        for relatedResource in relatedResources:
+            relatedResource.refresh_from_db()
+            self.assertEqual("new_name_{}".format(relatedResource.id), relatedResource.name)
+            self.assertEqual(resource, relatedResource.resource)
+            self.assertEqual(2, relatedResource.related_resources_1.count())
+
+    def testBulkPUTOfUnknownResource(self):
+        relatedResource = self._getOrCreateModelInstance()
+        contents = [self._buildContent({"id": relatedResource.id + 1, "name": "new_name"})]
+        resp = self.client.put(self._getRelativeListURI(RelatedResource2, {"resource": relatedResource.resource.id}),
+                               json.dumps(contents), drf_hal_json.HAL_JSON_MEDIA_TYPE)
+        self.assertEqual(404, resp.status_code, resp.content)
+
+    def testBulkPUTOfInvalidId(self):
+        relatedResource = self._getOrCreateModelInstance()
+        resp = self.client.put(self._getRelativeListURI(RelatedResource2, {"resource": relatedResource.resource.id}),
+                               json.dumps([self._buildContent({"id": "abc", "name": "new_name"})]),
+                               drf_hal_json.HAL_JSON_MEDIA_TYPE)
+        self.assertEqual(400, resp.status_code, resp.content)
+
+    def testBulkPOSTThroughPerformCreate(self):
+        content, parentLookups = self._createModelAsJson()
+        contents = [dict(content, name="related-resource2_{}".format(i)) for i in range(2)]
+        with patch.object(RelatedResource2ViewSet, "perform_create", autospec=True,
+                          side_effect=lambda view, serializer: serializer.save()) as performCreate:
+            resp = self._doPOST(self._getModelClass(), contents, parentLookups)
+        self.assertEqual(201, resp.status_code, resp.content)
+        self.assertEqual(2, performCreate.call_count)
+        self.assertEqual(2, RelatedResource2.objects.filter(name__startswith="related-resource2_").count())
+
+    def testBulkPUTSetsAutoNowFields(self):
+        relatedResource = self._getOrCreateModelInstance()
+        modified = relatedResource.modified
+        contents = [self._buildContent({"id": relatedResource.id, "name": "new_name"}, {
+            "related_resources_1": [self._getAbsoluteDetailURI(related)
+                                    for related in relatedResource.related_resources_1.all()]})]
+        resp = self.client.put(self._getRelativeListURI(RelatedResource2, {"resource": relatedResource.resource.id}),
+                               json.dumps(contents), drf_hal_json.HAL_JSON_MEDIA_TYPE)
+        self.assertEqual(200, resp.status_code, resp.content)
+        relatedResource.refresh_from_db()
+        self.assertGreater(relatedResource.modified, modified)
+
+    def testBulkPUTOfDuplicateResource(self):
+        relatedResource = self._getOrCreateModelInstance()
+        content = self._buildContent({"id": relatedResource.id, "name": "new_name"}, {
+            "related_resources_1": [self._getAbsoluteDetailURI(related)
+                                    for related in relatedResource.related_resources_1.all()]})
+        resp = self.client.put(self._getRelativeListURI(RelatedResource2, {"resource": relatedResource.resource.id}),
+                               json.dumps([content, content]), drf_hal_json.HAL_JSON_MEDIA_TYPE)
+        self.assertEqual(400, resp.status_code, resp.content)
+        self.assertEqual([{}, {"id": ["This field must be unique within the request."]}], resp.data)
+
+    def testOPTIONSListOfBulkUpdate(self):
+        resp = self._doOPTIONSList(self._getModelClass(), self._getWildcardedParentLookups(self._getModelClass()))
+        self.assertEqual(200, resp.status_code, resp.content)
+        self.assertIn("PUT", resp.data["actions"])
+
+    def testGETListQueryCount(self):
+        modelCount = len(self._getOrCreateModelList())
+        queryParams = {self._PAGE_SIZE_FIELD_NAME: modelCount}
+        # count, list with select_related parent and prefetch of related_resources_1
+        with self.assertNumQueries(3):
+            resp = self._doGETList(self._getModelClass(), queryParams, self._getWildcardedParentLookups(RelatedResource2))
+        self.assertEqual(200, resp.status_code, resp.content)
+        with self.assertNumQueries(3):
+            resp = self._doGETList(self._getModelClass(), dict(queryParams, no_links="true"),
+                                   self._getWildcardedParentLookups(RelatedResource2))
+        self.assertEqual(200, resp.status_code, resp.content)
+
+
+class QuerysetOptimizationTest(TestCase):
+    def setUp(self):
+        resource = TestResource.objects.create(name="resource")
+        RelatedResource1.objects.create(name="related", resource=resource)
+
+    def _getOptimizedQueryset(self, **declaredFields):
+        Meta = type("Meta", (), {"model": RelatedResource1, "fields": ("id",) + tuple(declaredFields)})
+        serializerClass = type("Serializer", (HalNestedFieldsModelSerializer,), dict(declaredFields, Meta=Meta))
+        return ReadModelMixin()._optimize_queryset(RelatedResource1.objects.all(), serializerClass)
+
+    def testOnlyLoadsSourceOfDeclaredField(self):
+        queryset = self._getOptimizedQueryset(label=CharField(source="name"))
+        self.assertEqual({"id", "name"}, queryset.query.deferred_loading[0])
+        with self.assertNumQueries(1):
+            self.assertEqual(["related"], [resource.name for resource in queryset])
+
+    def testDottedSourceAndMethodFieldsLoadAllColumns(self):
+        queryset = self._getOptimizedQueryset(name=CharField(source="resource.name"))
+        self.assertEqual((frozenset(), True), queryset.query.deferred_loading)
+        queryset = self._getOptimizedQueryset(active=SerializerMethodField())
+        self.assertEqual((frozenset(), True), queryset.query.deferred_loading)
+
 
 class ApiRootTest(BaseRestTest):
     def testGetApiRoot(self):
@@ -153,3 +321,787 @@ class ApiRootTest(BaseRestTest):
         self.assertEqual(2, len(resp.data[drf_hal_json.LINKS_FIELD_NAME]))
         self.assertTrue(len(resp.data[drf_hal_json.LINKS_FIELD_NAME]['viewsets']) > 0)
         self.assertTrue(len(resp.data[drf_hal_json.LINKS_FIELD_NAME]['views']) == 0)
+
+    def testGetApiRootWithETag(self):
+        resp = self.client.get("/")
+        self.assertEqual("http://testserver/test-resources/",
+                         resp.data[drf_hal_json.LINKS_FIELD_NAME]['viewsets']['test-resources'])
+        self.assertIn("no-cache", resp["Cache-Control"])
+        resp = self.client.get("/", HTTP_IF_NONE_MATCH=resp["ETag"])
+        self.assertEqual(304, resp.status_code)
+        resp = self.client.get("/", HTTP_IF_NONE_MATCH=resp["ETag"], secure=True)
+        self.assertEqual(200, resp.status_code)
+        self.assertEqual("https://testserver/test-resources/",
+                         resp.data[drf_hal_json.LINKS_FIELD_NAME]['viewsets']['test-resources'])
+
+    def testGetVersionedApiRoot(self):
+        with patch.object(resolve("/").func.cls, "versioning_class", QueryParameterVersioning):
+            for version in ("v1", "v2", "v1"):
+                resp = self.client.get("/", {"version": version})
+                self.assertEqual("http://testserver/test-resources/?version={}".format(version),
+                                 resp.data[drf_hal_json.LINKS_FIELD_NAME]['viewsets']['test-resources'])
+
+
+class ParentUrlTest(SimpleTestCase):
+    def _getParentUrl(self, method, path):
+        request = getattr(RequestFactory(), method)(path)
+        request.resolver_match = resolve(path)
+        return _get_parent_url(Request(request), "resource")
+
+    def testParentUrlOfNestedRoutes(self):
+        self.assertEqual("http://testserver/test-resources/1/", self._getParentUrl("post", "/test-resources/1/related-2/"))
+        self.assertEqual("http://testserver/test-resources/1/", self._getParentUrl("put", "/test-resources/1/related-2/5/"))
+        self.assertEqual("http://testserver/test-resources/1/",
+                         self._getParentUrl("post", "/test-resources/1/related-2.json"))
+
+
+class CsvSerializerTest(SimpleTestCase):
+    def testSerializeIterMatchesSerialize(self):
+        rows = [["a", 1, None], ["b\tc", 'say "hi"', 2.5]]
+        self.assertEqual(CsvSerializer.serialize(rows), b"".join(CsvSerializer.serialize_iter(iter(rows))))
+
+    def testSerializeIterYieldsChunks(self):
+        chunks = list(CsvSerializer.serialize_iter(([i, "x" * 10] for i in range(100)), chunk_size=100))
+        self.assertTrue(len(chunks) > 1)
+        self.assertEqual(100, b"".join(chunks).count(b"\n"))
+
+    def testStreamResponse(self):
+        response = CsvRenderer().stream(iter([["a", "b"]]), filename="export")
+        self.assertEqual('attachment; filename="export.csv"', response['Content-Disposition'])
+        self.assertEqual(b"a\tb\n", b"".join(response.streaming_content))
+
+    def testIterRowsSplitChunks(self):
+        content = 'name;städte\r\nä;"multi\nline"\r\n'.encode('utf-8')
+        rows = list(CsvSerializer.iter_rows(BytesIO(content), prefix_size=7, chunk_size=3))
+        self.assertEqual([['name', 'städte'], ['ä', 'multi\nline']], rows)
+
+    def testIterRowsInvalidCharacter(self):
+        with self.assertRaisesMessage(ValueError, "'0xff' at 12"):
+            list(CsvSerializer.iter_rows(BytesIO(b'a\tb\n' * 3 + b'\xff\tx\n'), prefix_size=8, chunk_size=5))
+
+    def testIterRowsWithoutDelimiter(self):
+        with self.assertRaises(ValueError):
+            CsvSerializer.iter_rows(BytesIO(b'abc\n'))
+
+
+class XlsxSerializerTest(SimpleTestCase):
+    def testSerializeTypedValues(self):
+        rows = [["name", 1, 2.5, Decimal("3.50"), date(2020, 1, 31), True]]
+        xlsx_bytes = XlsxSerializer.serialize(iter(rows))
+        values = [cell.value for cell in next(load_workbook(BytesIO(xlsx_bytes)).active.rows)]
+        self.assertEqual(["name", 1, 2.5, 3.5, True], values[:4] + values[5:])
+        self.assertEqual(date(2020, 1, 31), values[4].date())
+
+    def testSerializeIter(self):
+        chunks = list(XlsxSerializer.serialize_iter(([i, "x"] for i in range(1000)), chunk_size=1024))
+        self.assertTrue(len(chunks) > 1)
+        self.assertEqual(1000, load_workbook(BytesIO(b"".join(chunks))).active.max_row)
+
+    def testIterRows(self):
+        xlsx_file = BytesIO(XlsxSerializer.serialize([["a", 1], ["b", 2]]))
+        rows = XlsxSerializer.iter_rows(xlsx_file, None)
+        self.assertEqual(["a", 1], next(rows))
+        self.assertEqual([["b", 2]], list(rows))
+
+    def testIterRowsOpensWorkbookOnIteration(self):
+        rows = XlsxSerializer.iter_rows(BytesIO(b"no xlsx"), None)
+        rows.close()
+        with self.assertRaises(Exception):
+            next(XlsxSerializer.iter_rows(BytesIO(b"no xlsx"), None))
+
+    def testDeserializeUnknownSheet(self):
+        workbook = Workbook()
+        workbook.create_sheet("second")
+        xlsx_file = BytesIO()
+        workbook.save(xlsx_file)
+        with self.assertRaises(ValueError):
+            XlsxSerializer.deserialize(xlsx_file.getvalue(), None)
+        with self.assertRaises(ValueError):
+            XlsxSerializer.deserialize(xlsx_file.getvalue(), "unknown")
+        self.assertEqual([], XlsxSerializer.deserialize(xlsx_file.getvalue(), "second"))
+
+
+class FileUploadViewTest(TestCase):
+    def testImportInBatches(self):
+        view = FileUploadView(import_batch_size=2)
+        batches = []
+        self.assertEqual(5, view._import_in_batches(iter(range(5)), batches.append))
+        self.assertEqual([[0, 1], [2, 3], [4]], batches)
+        self.assertEqual(0, view._import_in_batches(iter([]), batches.append))
+        self.assertEqual(3, len(batches))
+
+    def testFailingBatchIsRolledBack(self):
+        def importBatch(batch):
+            for name in batch:
+                TestResource.objects.create(name=name)
+            if "d" in batch:
+                raise ValueError()
+
+        with self.assertRaises(ValueError):
+            FileUploadView(import_batch_size=2)._import_in_batches(iter("abcde"), importBatch)
+        self.assertEqual(["a", "b"], list(TestResource.objects.values_list("name", flat=True)))
+
+
+class ZipSerializerTest(SimpleTestCase):
+    def testSerializeIterMembers(self):
+        with NamedTemporaryFile() as file:
+            file.write(b"file content")
+            file.flush()
+            data = {
+                "bytes.txt": b"bytes content",
+                "file.txt": ZipMember(path=file.name),
+                "text.txt": "text content",
+                "rows.csv": CsvSerializer.serialize_iter([["a", "b"]] * 1000),
+                "deflated.txt": ZipMember(b"x" * 1000, zipfile.ZIP_DEFLATED, 9),
+            }
+            chunks = list(ZipSerializer.serialize_iter(data, chunk_size=1024))
+
+        self.assertTrue(len(chunks) > 1)
+        zip_file = zipfile.ZipFile(BytesIO(b"".join(chunks)))
+        self.assertEqual(b"bytes content", zip_file.read("bytes.txt"))
+        self.assertEqual(b"file content", zip_file.read("file.txt"))
+        self.assertEqual(b"text content", zip_file.read("text.txt"))
+        self.assertEqual(b"a\tb\n" * 1000, zip_file.read("rows.csv"))
+        self.assertEqual(b"x" * 1000, zip_file.read("deflated.txt"))
+        self.assertEqual(zipfile.ZIP_STORED, zip_file.getinfo("bytes.txt").compress_type)
+        self.assertEqual(zipfile.ZIP_DEFLATED, zip_file.getinfo("deflated.txt").compress_type)
+
+
+class AnyFileFromSystemRendererTest(SimpleTestCase):
+    def setUp(self):
+        self.file = NamedTemporaryFile(suffix=".txt")
+        self.file.write(b"0123456789")
+        self.file.flush()
+        self.renderer = AnyFileFromSystemRenderer()
+
+    def tearDown(self):
+        self.file.close()
+
+    def _getFileResponse(self, **headers):
+        return self.renderer.file_response(RequestFactory().get("/", **headers), self.file.name, "report.txt")
+
+    def testFileResponse(self):
+        response = self._getFileResponse()
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(b"0123456789", b"".join(response.streaming_content))
+        self.assertEqual("text/plain", response["Content-Type"])
+        self.assertEqual('attachment; filename="report.txt"', response["Content-Disposition"])
+
+    def testNotModified(self):
+        etag = self._getFileResponse()["ETag"]
+        self.assertEqual(304, self._getFileResponse(HTTP_IF_NONE_MATCH=etag).status_code)
+
+    def testRange(self):
+        response = self._getFileResponse(HTTP_RANGE="bytes=2-4")
+        self.assertEqual(206, response.status_code)
+        self.assertEqual("bytes 2-4/10", response["Content-Range"])
+        self.assertEqual(b"234", b"".join(response.streaming_content))
+        self.assertEqual(b"789", b"".join(self._getFileResponse(HTTP_RANGE="bytes=-3").streaming_content))
+        self.assertEqual(416, self._getFileResponse(HTTP_RANGE="bytes=10-").status_code)
+        self.assertEqual(200, self._getFileResponse(HTTP_RANGE="bytes=2-4", HTTP_IF_RANGE='"other"').status_code)
+
+    def testSendfile(self):
+        self.renderer.sendfile_header = "X-Sendfile"
+        response = self._getFileResponse()
+        self.assertEqual(self.file.name, response["X-Sendfile"])
+        self.assertEqual(b"", response.content)
+
+
+class SerializerClassCacheTest(SimpleTestCase):
+    def testGeneratedSerializerClassesAreCached(self):
+        router.warm_up_serializer_classes()
+        serializer_class = get_default_serializer_class(TestResource)
+        self.assertIs(serializer_class, get_default_serializer_class(TestResource))
+        self.assertEqual(TestResource, serializer_class.Meta.model)
+        no_links_serializer_class = get_no_links_serializer_class(serializer_class)
+        self.assertIs(no_links_serializer_class, get_no_links_serializer_class(serializer_class))
+        self.assertTrue(issubclass(no_links_serializer_class, serializer_class))
+
+
+class TestResourceFilterSet(ListFilterSet):
+    name = CharFilter(field_name="name")
+    name_contains = CharFilter(field_name="name", lookup_expr="icontains")
+
+    class Meta:
+        model = TestResource
+        fields = ["name", "name_contains"]
+
+
+class ListFilterSetTest(TestCase):
+    def setUp(self):
+        for name in ("alpha", "beta", "gamma"):
+            TestResource.objects.create(name=name)
+
+    def _filterNames(self, query):
+        filterset = TestResourceFilterSet(QueryDict(query), queryset=TestResource.objects.all())
+        return sorted(filterset.qs.values_list("name", flat=True))
+
+    def testExactValuesAreCombined(self):
+        self.assertEqual(["alpha", "gamma"], self._filterNames("name=alpha&name=gamma&name=unknown"))
+        self.assertEqual([], self._filterNames("name=unknown"))
+
+    def testLookupValuesAreCombined(self):
+        self.assertEqual(["alpha", "beta"], self._filterNames("name_contains=LP&name_contains=et"))
+
+
+class HalCursorPaginationTest(TestCase):
+    def setUp(self):
+        for name in ("d", "b", "e", "a", "c", "b"):
+            TestResource.objects.create(name=name)
+
+    def _getPage(self, url, queryset):
+        request = Request(RequestFactory().get(url))
+        paginator = HalCursorPagination()
+        page = paginator.paginate_queryset(queryset, request)
+        return paginator.get_paginated_response([resource.name for resource in page]).data
+
+    def _getAllPages(self, url, queryset):
+        names = []
+        while url:
+            data = self._getPage(url, queryset)
+            names += data[drf_hal_json.EMBEDDED_FIELD_NAME]
+            url = data[drf_hal_json.LINKS_FIELD_NAME]["next"]
+        return names
+
+    def testPagesFollowQuerysetOrdering(self):
+        self.assertEqual(["a", "b", "b", "c", "d", "e"],
+                         self._getAllPages("/test-resources/?page_size=2", TestResource.objects.order_by("name")))
+        self.assertEqual(["e", "d", "c", "b", "b", "a"],
+                         self._getAllPages("/test-resources/?page_size=4", TestResource.objects.order_by("-name")))
+
+    def testCountIsOnlyQueriedOnRequest(self):
+        with self.assertNumQueries(1):
+            data = self._getPage("/test-resources/?page_size=2", TestResource.objects.all())
+        self.assertNotIn("count", data)
+        with self.assertNumQueries(2):
+            data = self._getPage("/test-resources/?page_size=2&count=true", TestResource.objects.all())
+        self.assertEqual(6, data["count"])
+
+    def testRelatedFieldOrderingFallsBackToPk(self):
+        for resource in TestResource.objects.all():
+            RelatedResource1.objects.create(name=resource.name, resource=resource)
+        ids = list(RelatedResource1.objects.order_by("-id").values_list("id", flat=True))
+        for ordering in ("-resource__name", "-resource"):
+            request = Request(RequestFactory().get("/test-resources/?page_size=4"))
+            paginator = HalCursorPagination()
+            page = paginator.paginate_queryset(RelatedResource1.objects.order_by(ordering), request)
+            self.assertEqual(ids[:4], [related.id for related in page])
+            self.assertIsNotNone(paginator.get_next_link())
+
+    def testPositionFieldIsNotDeferred(self):
+        with self.assertNumQueries(1):
+            self._getPage("/test-resources/?page_size=2", TestResource.objects.only("id").order_by("name"))
+
+
+class BusinessPermissionLinkTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="user")
+        self.resources = [TestResource.objects.create(name="resource_{}".format(i)) for i in range(3)]
+        self.relatedResources = [RelatedResource1.objects.create(name="related_{}".format(resource.id),
+                                                                 resource=resource) for resource in self.resources]
+        TestPermissionService.calls[:] = []
+
+    def _checkLinks(self, links):
+        request = Request(APIRequestFactory().put("/permission/test-resources/", json.dumps({"_links": links}),
+                                                  content_type=drf_hal_json.HAL_JSON_MEDIA_TYPE),
+                          parsers=[JsonHalParser()])
+        request.user = self.user
+        return BusinessPermission()._check_links(request)
+
+    def _getLinks(self):
+        return {
+            "resource": "/permission/test-resources/{}/".format(self.resources[0].id),
+            "resources": ["/permission/test-resources/{}/".format(resource.id) for resource in self.resources[1:]],
+            "related": ["/permission/test-resources/{}/related-1/{}/".format(related.resource_id, related.id)
+                        for related in self.relatedResources],
+        }
+
+    def testLinkedObjectsAreFetchedPerModelAndParent(self):
+        # one query for the test resources and one per parent of the related resources
+        with self.assertNumQueries(4):
+            self.assertTrue(self._checkLinks(self._getLinks()))
+        self.assertEqual(6, len([call for call in TestPermissionService.calls if call[0] == "has_object_permission"]))
+
+    def testDeniedLink(self):
+        self.relatedResources[1].name = "forbidden"
+        self.relatedResources[1].save()
+        self.assertFalse(self._checkLinks(self._getLinks()))
+
+    def testUnknownLink(self):
+        links = self._getLinks()
+        links["related"].append("/permission/test-resources/{}/related-1/0/".format(self.resources[0].id))
+        with self.assertRaises(RelatedResource1.DoesNotExist):
+            self._checkLinks(links)
+
+
+class BulkPermissionTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="user")
+        self.client.force_login(self.user)
+        self.resources = [TestResource.objects.create(name=name) for name in ("resource_0", "resource_1", "readonly")]
+        self.related = RelatedResource1.objects.create(name="related", resource=self.resources[0])
+        TestPermissionService.calls[:] = []
+
+    def _post(self, contents):
+        return self.client.post("/permission/test-resources/{}/related-1/".format(self.resources[0].id),
+                                json.dumps(contents), content_type=drf_hal_json.HAL_JSON_MEDIA_TYPE)
+
+    def _put(self, contents):
+        return self.client.put("/permission/test-resources/{}/related-2/".format(self.resources[0].id),
+                               json.dumps(contents), content_type=drf_hal_json.HAL_JSON_MEDIA_TYPE)
+
+    @staticmethod
+    def _getResourceLinks(resource):
+        # the links of the serializers point to the resources without BusinessPermission
+        return {"resource": "/test-resources/{}/".format(resource.id)}
+
+    def _getRelated2Content(self, related2):
+        return {"id": related2.id, "name": "new_name", "_links": dict(self._getResourceLinks(self.resources[0]), **{
+            "related_resources_1": ["/test-resources/{}/related-1/{}/".format(self.resources[0].id, self.related.id)]})}
+
+    def testBulkCreatePermissionIsCheckedOncePerPermissionModel(self):
+        resp = self._post([{"name": "a", "_links": self._getResourceLinks(self.resources[1])},
+                           {"name": "b", "_links": self._getResourceLinks(self.resources[1])}])
+        self.assertEqual(400, resp.status_code, resp.content)  # the resource of RelatedResource1 is unique
+        self.assertEqual([{}, {"resource": ["This field must be unique within the request."]}], resp.data)
+        self.assertEqual(1, len([call for call in TestPermissionService.calls if call[0] == "has_permission"]))
+
+    def testBulkCreateNeedsCreatePermissionForEveryResource(self):
+        self.related.delete()
+        resp = self._post([{"name": "a", "_links": self._getResourceLinks(self.resources[0])},
+                           {"name": "b", "_links": self._getResourceLinks(self.resources[2])}])
+        self.assertEqual(403, resp.status_code, resp.content)
+        resp = self._post([{"name": "a", "_links": self._getResourceLinks(self.resources[0])},
+                           {"name": "b", "_links": self._getResourceLinks(self.resources[1])}])
+        self.assertEqual(201, resp.status_code, resp.content)
+        self.assertEqual(2, RelatedResource1.objects.count())
+
+    def testBulkUpdateChecksObjectPermissionsOfAllResources(self):
+        relatedResources = [RelatedResource2.objects.create(name=name, resource=self.resources[0])
+                            for name in ("related_0", "forbidden_1")]
+        resp = self._put([self._getRelated2Content(related) for related in relatedResources])
+        self.assertEqual(403, resp.status_code, resp.content)
+        self.assertEqual(["related_0", "forbidden_1"], [related.name for related in RelatedResource2.objects.all()])
+        resp = self._put([self._getRelated2Content(relatedResources[0])])
+        self.assertEqual(200, resp.status_code, resp.content)
+        self.assertEqual("new_name", RelatedResource2.objects.get(id=relatedResources[0].id).name)
+
+
+class SubqueryPermissionFilteringTest(TestCase):
+    def setUp(self):
+        self.resource = TestResource.objects.create(name="resource")
+        self.otherResource = TestResource.objects.create(name="other")
+        self.forbiddenResource = TestResource.objects.create(name="forbidden")
+        self.relatedResources = [RelatedResource2.objects.create(name="related", resource=resource)
+                                 for resource in (self.resource, self.otherResource, self.forbiddenResource)]
+
+    def _filter(self, model, user, permissionModelId=None, operation=Operation.READ):
+        return SubqueryPermissionFiltering(operation).filter(model.objects.order_by("id"), user, permissionModelId)
+
+    def testQuerysetIsFilteredBySubquery(self):
+        user = User.objects.create(username="user")
+        queryset = self._filter(RelatedResource2, user)
+        self.assertIn("EXISTS", str(queryset.query))
+        with self.assertNumQueries(1):
+            self.assertEqual(self.relatedResources[:2], list(queryset))
+        self.assertEqual([self.relatedResources[1]], list(self._filter(RelatedResource2, user, self.otherResource.id)))
+        self.assertEqual([], list(self._filter(RelatedResource2, user, self.forbiddenResource.id)))
+
+    def testPermissionModelIsFilteredByItself(self):
+        user = User.objects.create(username="user")
+        self.assertEqual([self.resource, self.otherResource], list(self._filter(TestResource, user)))
+
+    def testSuperReaderIsOnlyUnrestrictedForRead(self):
+        superReader = User.objects.create(username="reader", is_staff=True)
+        self.assertEqual(self.relatedResources, list(self._filter(RelatedResource2, superReader)))
+        self.assertEqual(self.relatedResources[:2],
+                         list(self._filter(RelatedResource2, superReader, operation=Operation.UPDATE)))
+        superUser = User.objects.create(username="super", is_superuser=True)
+        self.assertEqual(self.relatedResources,
+                         list(self._filter(RelatedResource2, superUser, operation=Operation.UPDATE)))
+
+
+class CachingPermissionServiceTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="user")
+        self.resource = TestResource.objects.create(name="resource")
+        self.service = CachingPermissionService(TestPermissionService(), cache_alias="default", key_prefix=self.id(),
+                                                invalidating_models=("testproject.TestResource",))
+        TestPermissionService.calls[:] = []
+
+    def tearDown(self):
+        self._finishRequest()
+
+    @staticmethod
+    def _startRequest():
+        request_started.disconnect(close_old_connections)
+        try:
+            request_started.send(sender=None)
+        finally:
+            request_started.connect(close_old_connections)
+
+    @staticmethod
+    def _finishRequest():
+        request_finished.disconnect(close_old_connections)
+        try:
+            request_finished.send(sender=None)
+        finally:
+            request_finished.connect(close_old_connections)
+
+    def _hasPermission(self):
+        return self.service.has_permission(self.user, self.resource.id, RelatedResource2, Operation.CREATE)
+
+    def testDecisionsAreCachedPerRequestAndAcrossRequests(self):
+        self._startRequest()
+        for _ in range(3):
+            self.assertTrue(self._hasPermission())
+            self.assertTrue(self.service.has_object_permission(self.user, self.resource, Operation.READ))
+        self.assertEqual(dict(request_hits=4, cache_hits=0, misses=2), self.service.cache.get_stats())
+        self._finishRequest()
+        self._startRequest()
+        self.assertTrue(self._hasPermission())
+        self.assertEqual(1, self.service.cache.get_stats()["cache_hits"])
+        self.assertEqual(2, len(TestPermissionService.calls))
+
+    def testOnlySharedCacheIsUsedOutsideOfRequests(self):
+        service = CachingPermissionService(TestPermissionService())
+        for _ in range(2):
+            service.has_permission(self.user, self.resource.id, RelatedResource2, Operation.CREATE)
+        self.assertEqual(dict(request_hits=0, cache_hits=0, misses=2), service.cache.get_stats())
+
+    def testPermissionsChangedInvalidatesDecisions(self):
+        self._hasPermission()
+        permissions_changed.send(sender=None)
+        self._hasPermission()
+        self.assertEqual(dict(request_hits=0, cache_hits=0, misses=2), self.service.cache.get_stats())
+
+    def testSavingInvalidatingModelInvalidatesDecisions(self):
+        self._hasPermission()
+        self._hasPermission()
+        self.resource.save()
+        self._hasPermission()
+        self.assertEqual(dict(request_hits=0, cache_hits=1, misses=2), self.service.cache.get_stats())
+
+    def testDeniedObjectsOfBulkCheckAreNotCached(self):
+        forbidden = TestResource.objects.create(name="forbidden")
+        self.assertFalse(self.service.has_objects_permission(self.user, [self.resource, forbidden], Operation.READ))
+        self.assertTrue(self.service.has_objects_permission(self.user, [self.resource], Operation.READ))
+        self.assertTrue(self.service.has_objects_permission(self.user, [self.resource], Operation.READ))
+        self.assertEqual(1, self.service.cache.get_stats()["cache_hits"])
+
+
+class ResolverTest(TestCase):
+    def testResolveManyFetchesObjectsPerModel(self):
+        resource = TestResource.objects.create(name="resource")
+        otherResource = TestResource.objects.create(name="other")
+        relatedResources = [RelatedResource2.objects.create(name=str(i), resource=resource) for i in range(3)]
+        urls = ["/test-resources/{}/".format(resource.id), "/test-resources/{}/".format(otherResource.id)] + \
+               ["/test-resources/{}/related-2/{}/".format(resource.id, related.id) for related in relatedResources] + \
+               ["/test-resources/{}/related-2/{}/".format(otherResource.id, relatedResources[0].id)]
+        with self.assertNumQueries(3):
+            objsByModel = resolve_many(urls)
+        self.assertEqual([resource, otherResource], list(objsByModel[TestResource].values()))
+        self.assertEqual(relatedResources + [None], list(objsByModel[RelatedResource2].values()))
+
+    def testResolvedUrlsAreCached(self):
+        resolvedUrl = resolve_url("http://testserver/test-resources/1/related-2/2/")
+        self.assertIs(resolvedUrl, resolve_url("/test-resources/1/related-2/2/"))
+        self.assertEqual(RelatedResource2, resolvedUrl.model)
+        self.assertEqual({"resource": "1", "pk": "2"}, resolvedUrl.lookups)
+
+
+class IdentityMapTest(TestCase):
+    def setUp(self):
+        self.resource = TestResource.objects.create(name="resource")
+        self.related = RelatedResource2.objects.create(name="related", resource=self.resource)
+        identity_map.activate()
+
+    def tearDown(self):
+        identity_map.deactivate()
+
+    def testInstancesAreFetchedOncePerRequest(self):
+        with self.assertNumQueries(1):
+            resource = identity_map.get(TestResource, self.resource.id)
+            self.assertIs(resource, identity_map.get(TestResource, str(self.resource.id)))
+            self.assertIs(resource, resolve_many(["/test-resources/{}/".format(self.resource.id)])[TestResource][
+                "/test-resources/{}/".format(self.resource.id)])
+
+    def testPartiallyLoadedInstancesAreOnlyReturnedForLoadedFields(self):
+        with self.assertNumQueries(1):
+            related = identity_map.get(RelatedResource2, self.related.id, ("pk", "resource"))
+            self.assertIs(related, identity_map.get(RelatedResource2, self.related.id, ("resource",)))
+        with self.assertNumQueries(1):
+            self.assertEqual("related", identity_map.get(RelatedResource2, self.related.id, ("name",)).name)
+        with self.assertNumQueries(1):
+            completeRelated = identity_map.get_many(RelatedResource2, [self.related.id])[str(self.related.id)]
+        self.assertIsNot(related, completeRelated)
+        self.assertEqual(set(), completeRelated.get_deferred_fields())
+        with self.assertNumQueries(0):
+            self.assertIs(completeRelated, identity_map.get(RelatedResource2, self.related.id))
+            self.assertIs(completeRelated, identity_map.get(RelatedResource2, self.related.id, ("pk", "resource")))
+
+    def testLinkFieldUsesIdentityMapOnlyForDefaultQueryset(self):
+        resource = identity_map.get(TestResource, self.resource.id)
+        viewKwargs = {"pk": str(self.resource.id)}
+
+        def getObject(queryset):
+            field = NestedHyperlinkedRelatedField(view_name="testresource-detail", queryset=queryset)
+            return field.get_object("testresource-detail", (), viewKwargs)
+
+        with self.assertNumQueries(0):
+            self.assertIs(resource, getObject(TestResource.objects.all()))
+        with self.assertNumQueries(1):
+            self.assertIsNot(resource, getObject(TestResource.objects.only("id")))
+        with self.assertNumQueries(1), self.assertRaises(TestResource.DoesNotExist):
+            getObject(TestResource.objects.exclude(name="resource"))
+
+    def testInstancesAreNotKeptOutsideOfRequests(self):
+        identity_map.deactivate()
+        identity_map.get(TestResource, self.resource.id)
+        with self.assertNumQueries(1):
+            identity_map.get(TestResource, self.resource.id)
+
+
+class EmailAuthBackendTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("user", "user@example.com", "secret")
+        self.backend = EmailAuthBackend()
+        self.backend.credential_cache = VerifiedCredentialCache(key_prefix=self.id())
+
+    def testAuthenticateWithEmailOrUsername(self):
+        self.assertEqual(self.user, self.backend.authenticate(None, username="user@example.com", password="secret"))
+        self.assertEqual(self.user, self.backend.authenticate(None, username="user", password="secret"))
+        self.assertIsNone(self.backend.authenticate(None, username="user", password="wrong"))
+        self.assertIsNone(self.backend.authenticate(None, username="unknown", password="secret"))
+
+    def testVerifiedCredentialsAreCached(self):
+        self.backend.authenticate(None, username="user", password="secret")
+        with self.assertNumQueries(1):
+            self.assertEqual(self.user, self.backend.authenticate(None, username="user", password="secret"))
+        self.assertIsNone(self.backend.authenticate(None, username="user", password="wrong"))
+        self.assertEqual(dict(hits=1, misses=2, invalidations=0), self.backend.credential_cache.get_stats())
+
+    def testCachedCredentialsAreInvalidatedOnPasswordChange(self):
+        self.backend.authenticate(None, username="user", password="secret")
+        self.user.set_password("changed")
+        self.user.save()
+        self.assertIsNone(self.backend.authenticate(None, username="user", password="secret"))
+        self.assertEqual(1, self.backend.credential_cache.get_stats()["invalidations"])
+        self.assertEqual(self.user, self.backend.authenticate(None, username="user", password="changed"))
+
+
+class RestLoggingTest(TestCase):
+    def setUp(self):
+        for i in range(20):
+            TestResource.objects.create(name="resource_{}".format(i))
+
+    def testRequestsAreLoggedWithSizes(self):
+        with self.assertLogs("drf_tools.views", logging.DEBUG) as logs:
+            response = self.client.get("/test-resources/?page_size=20")
+        summary = logs.records[0].rest
+        self.assertEqual("/test-resources/?page_size=20", summary["path"])
+        self.assertEqual(200, summary["status_code"])
+        self.assertEqual(len(response.content), summary["response_size"])
+        self.assertIsNotNone(summary["duration_ms"])
+        self.assertIn("request data: None", logs.output[1])
+
+    def testLoggedDataIsTruncated(self):
+        with patch.object(TestResourceViewSet, "logging_body_max_length", 50):
+            with self.assertLogs("drf_tools.views", logging.DEBUG) as logs:
+                self.client.get("/test-resources/?page_size=20")
+        self.assertLess(len(logs.records[1].getMessage()), 200)
+        self.assertTrue(logs.output[1].endswith("characters)"))
+
+    def testDataIsNotFormattedByQueueHandler(self):
+        records = Queue()
+        handler = DeferredFormattingQueueHandler(records)
+        with self.assertLogs("drf_tools.views", logging.DEBUG):
+            logging.getLogger("drf_tools.views").addHandler(handler)
+            self.client.get("/test-resources/")
+        records.get_nowait()
+        self.assertEqual("%s %s request data: %s response data: %s", records.get_nowait().msg)
+
+
+class RequestTimingTest(TestCase):
+    def setUp(self):
+        TestResource.objects.create(name="resource")
+
+    def testServerTimingIsNotReturnedByDefault(self):
+        self.assertNotIn("Server-Timing", self.client.get("/test-resources/"))
+
+    def testPhasesAreReturnedAsServerTiming(self):
+        with patch.object(TestResourceViewSet, "server_timing_header", True):
+            response = self.client.get("/test-resources/")
+        phases = [phase.split(";")[0] for phase in response["Server-Timing"].split(", ")]
+        self.assertEqual(["permissions", "filter", "serializer", "render", "total"], phases)
+        self.assertIn('total;dur=', response["Server-Timing"])
+
+    def testQueryCountingKeepsExecuteWrappersStacked(self):
+        def wrapper(execute, sql, params, many, context):
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(wrapper):
+            timings = start_request_timing()
+            TestResource.objects.count()
+            stop_request_timing(timings)
+            self.assertEqual([wrapper], connection.execute_wrappers)
+        self.assertEqual(1, timings.queries)
+        self.assertEqual([], connection.execute_wrappers)
+
+    def testTimingsAreSentToMetricsSink(self):
+        statsd = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        statsd.bind(("127.0.0.1", 0))
+        statsd.settimeout(5)
+        timedPhases = []
+
+        def onRequestTimed(timings, **kwargs):
+            timedPhases.append(timings)
+
+        request_timed.connect(onRequestTimed)
+        try:
+            with patch.object(TestResourceViewSet, "metrics_sink", StatsdMetricsSink(*statsd.getsockname())):
+                self.client.get("/test-resources/")
+            metrics = statsd.recv(4096).decode("utf-8").split("\n")
+        finally:
+            request_timed.disconnect(onRequestTimed)
+            statsd.close()
+        self.assertIn("drf_tools.TestResourceViewSet.list.total.queries:{}|g".format(timedPhases[0]["total"][1]),
+                      metrics)
+        self.assertTrue(any(metric.startswith("drf_tools.TestResourceViewSet.list.render:") for metric in metrics))
+
+
+class ValidationViewTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="user")
+        self.resource = TestResource.objects.create(name="resource")
+
+    def _post(self, data, **viewAttrs):
+        request = APIRequestFactory().post("/validations/", json.dumps(data), content_type=drf_hal_json.HAL_JSON_MEDIA_TYPE)
+        force_authenticate(request, self.user)
+        return ValidationView.as_view(**viewAttrs)(request)
+
+    def _requestData(self, name):
+        return {"_key": "testproject_resource_name", "name": name,
+                "_links": {"resource": "/test-resources/{}/".format(self.resource.id)}}
+
+    def testValidate(self):
+        resp = self._post(self._requestData("other"))
+        self.assertEqual({"valid": True}, resp.data)
+
+    def testValidateBatch(self):
+        with self.assertNumQueries(1):
+            resp = self._post([self._requestData("resource"), self._requestData("other")])
+        self.assertEqual(200, resp.status_code)
+        self.assertEqual(2, len(resp.data))
+        self.assertFalse(resp.data[0]["valid"])
+        self.assertEqual('Name "resource" is already used.', resp.data[0]["failedValidations"][0]["msg"])
+        self.assertEqual({"valid": True}, resp.data[1])
+
+    def testValidateBatchInThreadPool(self):
+        resp = self._post([self._requestData(name) for name in ("a", "resource", "b")], max_workers=2)
+        self.assertEqual([True, False, True], [result["valid"] for result in resp.data])
+
+    def testBatchSizeIsLimited(self):
+        resp = self._post([self._requestData("other")] * 3, max_batch_size=2)
+        self.assertEqual(400, resp.status_code)
+
+    def testResultsAreCached(self):
+        requestData = dict(self._requestData("resource"), _key="testproject_cached_resource_name")
+        validateCount = CachedResourceName.validateCount
+        self.assertFalse(self._post(requestData).data["valid"])
+        self.assertFalse(self._post(requestData).data["valid"])
+        self.assertEqual(validateCount + 1, CachedResourceName.validateCount)
+        self.resource.name = "renamed"
+        self.resource.save()
+        self.assertTrue(self._post(requestData).data["valid"])
+        self.assertEqual(validateCount + 2, CachedResourceName.validateCount)
+
+
+class ValidationRegistryTest(SimpleTestCase):
+    def testValidationsAreLoadedOnDemand(self):
+        registry = ValidationRegistry()
+        self.assertIs(ResourceName, registry.get("testproject_resource_name"))
+        self.assertRaises(ValidationNotFoundException, registry.get, "testproject_unknown")
+        self.assertEqual({"testproject_resource_name": ResourceName,
+                          "testproject_cached_resource_name": CachedResourceName}, registry.getAll())
+
+    def testValidationsAreLoadedFromManifest(self):
+        manifest = ValidationRegistry().createManifest()
+        self.assertEqual({"testproject_resource_name": {"class": "testproject.validations.ResourceName",
+                                                        "cacheInvalidatingModels": []},
+                          "testproject_cached_resource_name": {"class": "testproject.validations.CachedResourceName",
+                                                               "cacheInvalidatingModels": ["testproject.TestResource"]}},
+                         manifest)
+        with NamedTemporaryFile("w", suffix=".json") as manifestFile:
+            json.dump(manifest, manifestFile)
+            manifestFile.flush()
+            self.assertIs(ResourceName, ValidationRegistry(manifestFile.name).get("testproject_resource_name"))
+
+    def testCacheInvalidationIsConnectedFromManifest(self):
+        manifest = {"testproject_cached_resource_name": {"class": "testproject.unknown.CachedResourceName",
+                                                         "cacheInvalidatingModels": ["testproject.TestResource"]},
+                    "testproject_resource_name": "testproject.validations.ResourceName"}
+        with NamedTemporaryFile("w", suffix=".json") as manifestFile:
+            json.dump(manifest, manifestFile)
+            manifestFile.flush()
+            with patch("drf_tools.validation.registry.validationResultCache") as cache:
+                ValidationRegistry(manifestFile.name).connectCacheInvalidation()
+                cache.connectInvalidatingModels.assert_called_once_with("testproject_cached_resource_name",
+                                                                        ["testproject.TestResource"])
+
+    def testNoValidationsAreLoadedWithoutManifest(self):
+        with patch("drf_tools.validation.registry.validationResultCache") as cache, \
+                patch("drf_tools.validation.registry.import_module") as importModule:
+            ValidationRegistry("/nonexistent/manifest.json").connectCacheInvalidation()
+        importModule.assert_not_called()
+        cache.connectInvalidatingModels.assert_not_called()
+
+    def testCacheInvalidationIsConnectedOnLoad(self):
+        with patch("drf_tools.validation.registry.validationResultCache") as cache:
+            ValidationRegistry().get("testproject_cached_resource_name")
+            cache.connectInvalidatingModels.assert_any_call("testproject_cached_resource_name",
+                                                            ("testproject.TestResource",))
+
+
+class ValidationResultCacheTest(TestCase):
+    def setUp(self):
+        self.cache = ValidationResultCache()
+        self.resource = TestResource.objects.create(name="resource")
+
+    def testCacheKeyIsStable(self):
+        cacheKey = self.cache.getCacheKey("key", CachedResourceName, {"a": Decimal("1.5"), "b": [date(2020, 1, 1)],
+                                                                     "resource": self.resource})
+        self.assertEqual(cacheKey, self.cache.getCacheKey("key", CachedResourceName, {
+            "resource": self.resource, "b": [date(2020, 1, 1)], "a": Decimal("1.5")}))
+        self.assertNotEqual(cacheKey, self.cache.getCacheKey("key", CachedResourceName, {
+            "resource": self.resource, "b": [date(2020, 1, 1)], "a": "1.5"}))
+
+    def testUnserializableDataIsNotCached(self):
+        self.assertIsNone(self.cache.getCacheKey("key", CachedResourceName, {"a": object()}))
+        self.assertIsNone(self.cache.getCacheKey("key", ResourceName, {"a": 1}))
+
+    def testSavingInvalidatingModelInvalidates(self):
+        self.cache.connectInvalidatingModels("key", ["testproject.TestResource"])
+        cacheKey = self.cache.getCacheKey("key", CachedResourceName, {"a": 1})
+        RelatedResource1.objects.create(name="related", resource=self.resource)
+        self.assertEqual(cacheKey, self.cache.getCacheKey("key", CachedResourceName, {"a": 1}))
+        self.resource.save()
+        self.assertNotEqual(cacheKey, self.cache.getCacheKey("key", CachedResourceName, {"a": 1}))
+
+
+class EnumFilterTest(SimpleTestCase):
+    def testGetEnumValues(self):
+        self.assertEqual([Operation.READ, Operation.CREATE], EnumFilter(Operation).get_enum_values(["READ", "CREATE"]))
+        self.assertEqual([Operation.READ], EnumFilter(Operation, case_insensitive=True).get_enum_values(["read"]))
+
+    def testEnumFiltersWithCustomFilterAreAppliedPerValue(self):
+        class CustomEnumFilter(EnumFilter):
+            def filter(self, qs, value):
+                return super(CustomEnumFilter, self).filter(qs, value)
+
+        self.assertTrue(ListFilterSet._is_lookup_filter(EnumFilter(Operation, field_name="operation")))
+        self.assertFalse(ListFilterSet._is_lookup_filter(CustomEnumFilter(Operation, field_name="operation")))
+
+    def testAllInvalidValuesAreReported(self):
+        with self.assertRaisesMessage(ValueError, "'read', 'unknown' are not valid values for 'Operation'"):
+            EnumFilter(Operation).get_enum_values(["read", "CREATE", "unknown"])
@@ -3,7 +3,8 @@ from django.conf.urls import patterns, url, include
 from django.contrib import admin
 
 from drf_tools.routers import NestedRouterWithExtendedRootView
-from .views import TestResourceViewSet, RelatedResource1ViewSet, RelatedResource2ViewSet
+from .views import TestResourceViewSet, RelatedResource1ViewSet, RelatedResource2ViewSet, PermissionTestResourceViewSet, \
+    PermissionRelatedResource1ViewSet, PermissionRelatedResource2ViewSet
 
 admin.autodiscover()
 
@@ -12,7 +13,17 @@ test_resource_route = router.register(r'test-resources', TestResourceViewSet)
 test_resource_route.register(r'related-1', RelatedResource1ViewSet, ['resource'])
 test_resource_route.register(r'related-2', RelatedResource2ViewSet, ['resource'])
 
+# the same resources with BusinessPermission
+permission_router = NestedRouterWithExtendedRootView(list())
+permission_route = permission_router.register(r'test-resources', PermissionTestResourceViewSet,
+                                              basename='permissiontestresource')
+permission_route.register(r'related-1', PermissionRelatedResource1ViewSet, ['resource'],
+                          basename='permissionrelatedresource1')
+permission_route.register(r'related-2', PermissionRelatedResource2ViewSet, ['resource'],
+                          basename='permissionrelatedresource2')
+
 urlpatterns = patterns(
     '',
+    url(r'^permission/', include(permission_router.urls)),
     url(r'', include(router.urls)),
 )
@@ -0,0 +1,22 @@
+from drf_tools.validation.base import Validation
+
+
+class ResourceName(Validation):
+    def __init__(self, data):
+        super(ResourceName, self).__init__('name')
+        self.__data = data
+
+    def _validate(self):
+        resource = self.__data.get('resource')
+        if resource is not None and resource.name == self.__data.get('name'):
+            self._addFailure('duplicate', {'name': resource.name}, 'Name "{name}" is already used.')
+
+
+class CachedResourceName(ResourceName):
+    cacheTimeout = 60
+    cacheInvalidatingModels = ('testproject.TestResource',)
+    validateCount = 0
+
+    def _validate(self):
+        CachedResourceName.validateCount += 1
+        super(CachedResourceName, self)._validate()
@@ -1,6 +1,7 @@
 from drf_nested_routing.views import NestedViewSetMixin
 
-from drf_tools.views import ModelViewSet
+from drf_tools.auth.permissions import BusinessPermission
+from drf_tools.views import BulkModelViewSet, ModelViewSet
 from .models import TestResource, RelatedResource2, RelatedResource1
 
 
@@ -12,5 +13,20 @@ class RelatedResource1ViewSet(NestedViewSetMixin, ModelViewSet):
     queryset = RelatedResource1.objects.all()
 
 
-class RelatedResource2ViewSet(NestedViewSetMixin, ModelViewSet):
+class RelatedResource2ViewSet(NestedViewSetMixin, BulkModelViewSet):
     queryset = RelatedResource2.objects.all()
+
+
+class PermissionTestResourceViewSet(ModelViewSet):
+    queryset = TestResource.objects.all()
+    permission_classes = (BusinessPermission,)
+
+
+class PermissionRelatedResource1ViewSet(NestedViewSetMixin, BulkModelViewSet):
+    queryset = RelatedResource1.objects.all()
+    permission_classes = (BusinessPermission,)
+
+
+class PermissionRelatedResource2ViewSet(NestedViewSetMixin, BulkModelViewSet):
+    queryset = RelatedResource2.objects.all()
+    permission_classes = (BusinessPermission,)